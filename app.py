@@ -1,12 +1,23 @@
-from hate.pipeline.train_pipeline import TrainPipeline
 from fastapi import FastAPI
 import uvicorn
 import sys
+import asyncio
+from typing import List
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
+from fastapi import HTTPException
 from fastapi.templating import Jinja2Templates
 from starlette.responses import RedirectResponse
 from fastapi.responses import Response
 from hate.pipeline.prediction_pipeline import PredictionPipeline
+from hate.pipeline.micro_batcher import MicroBatcher
+from hate.pipeline.training_jobs import TrainingJobManager
+from hate.ml.model_registry import get_model_registry
+from hate.ml.text_cleaner import get_text_cleaner
+from hate.utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, Counter, Gauge, MetricsMiddleware
 from hate.exception import CustomException
+from hate.logger import logging, request_logger
 from hate.constants import *
 
 
@@ -14,6 +25,100 @@ text:str = "What is machine learing?"
 
 app = FastAPI()
 
+# Built by the startup hook, not at import: spawned worker processes (training jobs,
+# the text cleaning pool) re-import this module and must not start services or
+# touch the training job queue
+inference_executor = None
+io_executor = None
+training_job_manager = None
+prediction_pipeline = None
+micro_batcher = None
+prediction_slots = asyncio.Semaphore(MAX_CONCURRENT_PREDICTIONS)
+
+# Filled with every route once they are all declared, see the end of this module
+route_names = {}
+# Also the access log: sampled, replacing uvicorn's synchronous one
+app.add_middleware(MetricsMiddleware, route_names=route_names, access_logger=request_logger)
+
+
+def _cache_stat(name):
+    cache = prediction_pipeline.prediction_cache if prediction_pipeline is not None else None
+    return cache.stats()[name] if cache is not None else None
+
+
+def _model_info():
+    model_registry = get_model_registry()
+    if not model_registry.is_loaded:
+        return {}
+    return {(str(model_registry.version), model_registry.runtime): 1}
+
+
+# Read from the pipeline and registry at scrape time, the request path pays nothing for them
+REGISTRY.register(Counter("hate_prediction_cache_hits_total", "Prediction cache hits.",
+                          function=partial(_cache_stat, "hits")))
+REGISTRY.register(Counter("hate_prediction_cache_misses_total", "Prediction cache misses.",
+                          function=partial(_cache_stat, "misses")))
+REGISTRY.register(Gauge("hate_prediction_cache_hit_ratio", "Share of prediction cache lookups that hit.",
+                        function=partial(_cache_stat, "hit_rate")))
+REGISTRY.register(Gauge("hate_prediction_cache_entries", "Scores held in the prediction cache.",
+                        function=partial(_cache_stat, "size")))
+REGISTRY.register(Gauge("hate_model_info", "Model version and runtime being served.", ("version", "runtime"),
+                        function=_model_info))
+REGISTRY.register(Gauge("hate_model_load_duration_seconds", "Duration of the last model and encoder load.",
+                        function=lambda: get_model_registry().load_seconds))
+REGISTRY.register(Counter("hate_model_loads_total", "Model loads, including reloads.",
+                          function=lambda: get_model_registry().loads))
+
+
+class BatchPredictionRequest(BaseModel):
+    texts: List[str]
+
+
+def check_prediction_capacity():
+    if prediction_slots.locked():
+        raise HTTPException(status_code=503, detail="Prediction service is at capacity, retry later")
+
+
+async def run_blocking(executor, fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args, **kwargs))
+
+
+@app.on_event("startup")
+async def start_services():
+    global inference_executor, io_executor, training_job_manager, prediction_pipeline, micro_batcher
+    # Blocking work never runs on the event loop: model forward passes and model downloads
+    # each get their own bounded pool so one cannot starve the other
+    inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-io")
+
+    # Training runs in a separate worker process, one run at a time
+    training_job_manager = TrainingJobManager()
+    # Only the serving process fails the jobs a previous app process left queued or running
+    await run_blocking(io_executor, training_job_manager.fail_interrupted_jobs)
+
+    prediction_pipeline = PredictionPipeline()
+    micro_batcher = MicroBatcher(prediction_pipeline.predict_batch, executor=inference_executor,
+                                 max_in_flight=INFERENCE_WORKERS)
+    micro_batcher.start()
+    try:
+        await run_blocking(io_executor, get_model_registry().load)
+    except Exception as e:
+        # The model is loaded lazily on the first prediction instead
+        logging.error(f"Could not load the model at startup: {e}")
+    try:
+        # Building the cleaner imports nltk, do it before the first request
+        await run_blocking(io_executor, get_text_cleaner)
+    except Exception as e:
+        logging.error(f"Could not build the text cleaner at startup: {e}")
+
+
+@app.on_event("shutdown")
+async def stop_services():
+    await micro_batcher.stop()
+    inference_executor.shutdown(wait=False)
+    io_executor.shutdown(wait=False)
+
+
 @app.get("/", tags=["authentication"])
 async def index():
     return RedirectResponse(url="/docs")
@@ -21,35 +126,93 @@ async def index():
 
 
 
-@app.get("/train")
-async def training():
+# POST only: a GET from a crawler, prefetch or page refresh must not queue a training run
+@app.post("/train")
+async def training(resume: bool = TRAINING_RESUME):
     try:
-        train_pipeline = TrainPipeline()
+        # Returns immediately, poll /train/{job_id} for progress
+        return await run_blocking(io_executor, training_job_manager.submit, resume=resume)
+    except Exception as e:
+        raise CustomException(e, sys) from e
 
-        train_pipeline.run_pipeline()
 
-        return Response("Training successful !!")
+@app.get("/train/jobs")
+async def list_training_jobs():
+    return await run_blocking(io_executor, training_job_manager.list)
+
+
+@app.get("/train/{job_id}")
+async def training_status(job_id: str):
+    status = await run_blocking(io_executor, training_job_manager.get, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return status
+
+
+@app.delete("/train/{job_id}")
+async def cancel_training(job_id: str):
+    status = await run_blocking(io_executor, training_job_manager.cancel, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return status
 
-    except Exception as e:
-        return Response(f"Error Occurred! {e}")
-    
 
 
 @app.post("/predict")
 async def predict_route(text):
+    check_prediction_capacity()
     try:
-
-        obj = PredictionPipeline()
-        text = obj.run_pipeline(text)
+        async with prediction_slots:
+            # Concurrent requests are grouped into one model call by the micro-batcher
+            text = await micro_batcher.submit(text)
         return text
     except Exception as e:
         raise CustomException(e, sys) from e
-    
 
 
 
-if __name__=="__main__":
-    uvicorn.run(app, host=APP_HOST, port=APP_PORT)
+@app.post("/predict_batch")
+async def predict_batch_route(request: BatchPredictionRequest):
+    if len(request.texts) > MAX_BATCH_PREDICTION_TEXTS:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {MAX_BATCH_PREDICTION_TEXTS} texts are accepted per request")
+    check_prediction_capacity()
+    try:
+        async with prediction_slots:
+            return await run_blocking(inference_executor, prediction_pipeline.predict_batch, request.texts)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+
+@app.get("/predict/cache")
+async def prediction_cache_stats():
+    model_registry = get_model_registry()
+    cache = prediction_pipeline.prediction_cache
+    return {"model_version": model_registry.version, "enabled": cache is not None,
+            **(cache.stats() if cache is not None else {})}
+
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 
 
-    
+@app.post("/reload")
+async def reload_model(force: bool = False):
+    try:
+        model_registry = get_model_registry()
+        reloaded = await run_blocking(io_executor, model_registry.reload, force=force)
+        return {"reloaded": reloaded, "version": model_registry.version}
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+
+route_names.update({route.endpoint: route.path for route in app.routes})
+
+
+if __name__=="__main__":
+    uvicorn.run(app, host=APP_HOST, port=APP_PORT, access_log=False)
@@ -0,0 +1,75 @@
+"""
+Benchmark: length-bucketed vs fully padded NumPy inference on the test split.
+
+    python benchmarks/bench_bucketed_inference.py --artifacts-dir artifacts/<timestamp>
+
+Uses the tokenized test sequences and model_weights.npz of a training run (the
+weights are exported from model.h5 when missing), checks that both modes give
+the same predictions and reports their throughput.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hate.constants import *
+from hate.ml.numpy_model import NumpyBiLSTM, export_numpy_weights, sequence_lengths
+
+
+def latest_run(artifacts_root: str = "artifacts") -> str:
+    # Resumed runs may have reused an earlier run's trainer stage
+    for run in sorted(os.listdir(artifacts_root), reverse=True):
+        trainer_dir = os.path.join(artifacts_root, run, MODEL_TRAINER_ARTIFACTS_DIR)
+        if os.path.isfile(os.path.join(trainer_dir, X_TEST_SEQUENCES_FILE_NAME)):
+            return os.path.join(artifacts_root, run)
+    raise SystemExit(f"No training run with test sequences found in {artifacts_root}")
+
+
+def bench(model, sequences, repeat: int):
+    model.predict_on_batch(sequences[:model.batch_size])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scores = model.predict_on_batch(sequences)
+        best = min(best, time.perf_counter() - start)
+    return best, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--artifacts-dir", default=None, help="training run directory, the latest by default")
+    parser.add_argument("--rows", type=int, default=None, help="limit the number of test rows")
+    parser.add_argument("--batch-size", type=int, default=NUMPY_INFERENCE_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    trainer_dir = os.path.join(args.artifacts_dir or latest_run(), MODEL_TRAINER_ARTIFACTS_DIR)
+    sequences = np.load(os.path.join(trainer_dir, X_TEST_SEQUENCES_FILE_NAME))[:args.rows]
+    weights_path = os.path.join(trainer_dir, INFERENCE_WEIGHTS_NAME)
+    if not os.path.isfile(weights_path):
+        import keras
+        export_numpy_weights(keras.models.load_model(os.path.join(trainer_dir, TRAINED_MODEL_NAME)), weights_path)
+
+    padded_time, padded_scores = bench(NumpyBiLSTM.load(weights_path, args.batch_size, bucketing=False),
+                                       sequences, args.repeat)
+    bucketed_time, bucketed_scores = bench(NumpyBiLSTM.load(weights_path, args.batch_size, bucketing=True),
+                                           sequences, args.repeat)
+
+    mismatches = int(np.sum((padded_scores > PREDICTION_THRESHOLD) != (bucketed_scores > PREDICTION_THRESHOLD)))
+    if mismatches:
+        raise SystemExit(f"{mismatches} predictions differ between padded and bucketed inference")
+
+    lengths = sequence_lengths(sequences)
+    rows = len(sequences)
+    print(f"rows                : {rows} (padded to {sequences.shape[1]})")
+    print(f"tokens p50/p90/max  : {np.percentile(lengths, 50):.0f} / {np.percentile(lengths, 90):.0f} / {lengths.max()}")
+    print(f"padded              : {padded_time:.3f}s ({rows / padded_time:,.0f} rows/s)")
+    print(f"bucketed            : {bucketed_time:.3f}s ({rows / bucketed_time:,.0f} rows/s)")
+    print(f"speedup             : {padded_time / bucketed_time:.1f}x")
+    print(f"max score diff      : {np.max(np.abs(padded_scores - bucketed_scores)):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Cold start benchmark: what importing the serving entry points costs.
+
+    python benchmarks/bench_import_time.py --module app --top 15
+
+Imports each module in a fresh interpreter under `python -X importtime`, prints
+its total import time, the slowest imports and any heavy training-only package
+(TensorFlow, pandas, sklearn, nltk, ...) that got pulled in.
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from hate.utils.import_time import import_times
+
+HEAVY_MODULES = ("tensorflow", "keras", "sklearn", "pandas", "nltk", "scipy")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", action="append", default=None,
+                        help="module to import, repeatable (default: app and the prediction pipeline)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module, the fastest is reported")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    # Importing app creates its working directories, keep them out of the repo
+    workdir = tempfile.mkdtemp(prefix="import_time_")
+    for module in args.module or ["app", "hate.pipeline.prediction_pipeline"]:
+        runs = [import_times(module, cwd=workdir, env=env) for _ in range(args.repeat)]
+        times = min(runs, key=lambda run: run[module])
+        heavy = sorted({name.split(".")[0] for name in times} & set(HEAVY_MODULES))
+
+        print(f"{module}: {times[module]:.3f}s, {len(times)} modules")
+        for name, seconds in sorted(times.items(), key=lambda item: -item[1])[1:args.top + 1]:
+            print(f"  {seconds:8.3f}s  {name}")
+        print(f"  heavy packages: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
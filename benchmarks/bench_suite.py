@@ -0,0 +1,221 @@
+"""
+Benchmark suite for the train and predict hot paths on a synthetic tweet corpus.
+
+    python benchmarks/bench_suite.py run --rows 20000 --output results/baseline.json
+    python benchmarks/bench_suite.py run --rows 20000 --output results/change.json
+    python benchmarks/bench_suite.py compare results/baseline.json results/change.json --threshold 0.1
+
+`run` generates a reproducible corpus (size, token length distribution and
+duplication rate are configurable), times per-row text cleaning, the full data
+transformation, tokenizing, single and batched predictions and model evaluation
+with the real components, and writes the timings as JSON. The model is built
+untrained: latency does not depend on the weights. Everything the components
+write goes to a scratch directory.
+
+`compare` prints the relative change of every timing present in both files
+and exits with status 1 when one got slower than the threshold allows.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from hate.utils.benchmarking import (generate_corpus, ingestion_frames, measure, percentiles, summarize,
+                                     write_results, load_results, compare_results)
+
+CASES = ("concat_data_cleaning", "initiate_data_transformation", "tokenizing",
+         "predict_single", "predict_batch", "evaluate")
+
+
+class ResidentModel:
+    """Serves one in-memory model to PredictionPipeline in place of the storage-backed ModelRegistry."""
+
+    def __init__(self, model, encoder, version: str = "benchmark"):
+        self.state = (model, encoder, version)
+
+    def get(self):
+        return self.state
+
+
+def latency_case(fn, inputs: list, repeat: int, setup=None, rows: int = None) -> dict:
+    """Time `fn` on every input, `repeat` times; percentiles are over single calls."""
+    fn(inputs[0])
+    latencies, totals = [], []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for value in inputs:
+            call_start = time.perf_counter()
+            fn(value)
+            latencies.append(time.perf_counter() - call_start)
+        totals.append(time.perf_counter() - start)
+    return summarize(totals, rows=rows or len(inputs), calls=len(inputs), **percentiles(latencies))
+
+
+def run(args) -> dict:
+    output = os.path.abspath(args.output)
+    cases = args.case or list(CASES)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_suite_")
+    os.makedirs(workdir, exist_ok=True)
+    # Components write artifacts, logs and the tokenizer relative to the working directory
+    os.chdir(workdir)
+
+    import numpy as np
+    import pandas as pd
+    from hate.constants import MAX_LEN, INFERENCE_MODEL_NAME, INFERENCE_WEIGHTS_NAME
+    from hate.ml.text_cleaner import get_text_cleaner
+    from hate.ml.sequence_encoder import SequenceEncoder
+    from hate.entity.config_entity import (DataIngestionConfig, DataTransformationConfig, ModelTrainerConfig,
+                                           ModelEvaluationConfig)
+    from hate.entity.artifact_entity import DataIngestionArtifacts, DataTransformationArtifacts
+    from hate.components.data_transforamation import DataTransformation
+
+    texts, labels = generate_corpus(args.rows, seed=args.seed, vocabulary_size=args.vocabulary_size,
+                                    mean_tokens=args.mean_tokens, max_tokens=args.max_tokens,
+                                    duplicate_rate=args.duplicate_rate)
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "workdir", "command")}
+    params["unique_texts"] = len(set(texts))
+    print(f"corpus: {len(texts)} rows, {params['unique_texts']} unique, workdir {workdir}")
+
+    results = {}
+    transformation_config = DataTransformationConfig()
+    raw_frame, imbalance_frame = ingestion_frames(texts, labels)
+    ingestion_config = DataIngestionConfig()
+    os.makedirs(ingestion_config.DATA_INGESTION_ARTIFACTS_DIR, exist_ok=True)
+    ingestion_artifacts = DataIngestionArtifacts(imbalance_data_file_path=ingestion_config.DATA_ARTIFACTS_DIR,
+                                                 raw_data_file_path=ingestion_config.NEW_DATA_ARTIFACTS_DIR)
+    raw_frame.to_csv(ingestion_artifacts.raw_data_file_path, index=False)
+    imbalance_frame.to_csv(ingestion_artifacts.imbalance_data_file_path, index=False)
+    transformation = DataTransformation(transformation_config, ingestion_artifacts)
+
+    cleaner = get_text_cleaner()
+    cleaned = [cleaner.clean(text) for text in texts]
+
+    if "concat_data_cleaning" in cases:
+        times = measure(lambda: [transformation.concat_data_cleaning(text) for text in texts], repeat=args.repeat)
+        results["concat_data_cleaning"] = summarize(times, rows=len(texts))
+
+    if "initiate_data_transformation" in cases:
+        times = measure(transformation.initiate_data_transformation, repeat=args.repeat)
+        results["initiate_data_transformation"] = summarize(times, rows=len(texts),
+                                                            n_jobs=transformation._n_jobs())
+
+    needs_model = {"predict_single", "predict_batch", "evaluate"} & set(cases)
+    if "tokenizing" in cases or needs_model:
+        from hate.components.model_trainer import ModelTrainer
+
+        trainer = ModelTrainer(DataTransformationArtifacts(transformation_config.TRANSFORMED_FILE_PATH),
+                               ModelTrainerConfig())
+        x_train = pd.Series(cleaned)
+        tokenized = []
+        times = measure(lambda: tokenized.append(trainer.tokenizing(x_train)), repeat=args.repeat)
+        if "tokenizing" in cases:
+            results["tokenizing"] = summarize(times, rows=len(cleaned))
+        encoder = SequenceEncoder.from_tokenizer(tokenized[-1][1], max_len=MAX_LEN)
+
+    if needs_model:
+        from hate.ml.model import ModelArchitecture
+        from hate.pipeline.prediction_pipeline import PredictionPipeline
+
+        model = ModelArchitecture().get_model()
+        serving_model = model
+        if args.runtime == "tflite":
+            from hate.ml.inference_export import export_tflite, TFLiteModel
+            serving_model = TFLiteModel(export_tflite(model, INFERENCE_MODEL_NAME, max_len=MAX_LEN))
+        elif args.runtime == "numpy":
+            from hate.ml.numpy_model import export_numpy_weights, NumpyBiLSTM
+            serving_model = NumpyBiLSTM.load(export_numpy_weights(model, INFERENCE_WEIGHTS_NAME))
+
+        pipeline = PredictionPipeline(model_registry=ResidentModel(serving_model, encoder))
+        # Every repeat starts cold, the corpus duplication rate decides the cache hits
+        reset_cache = pipeline.prediction_cache.clear if pipeline.prediction_cache is not None else None
+        sample = texts[:args.predict_rows]
+
+        if "predict_single" in cases:
+            results["predict_single"] = latency_case(pipeline.predict, sample, args.repeat, setup=reset_cache)
+        if "predict_batch" in cases:
+            batches = [sample[start:start + args.batch_size] for start in range(0, len(sample), args.batch_size)]
+            results["predict_batch"] = latency_case(pipeline.predict_batch, batches, args.repeat,
+                                                    setup=reset_cache, rows=len(sample))
+
+        if "evaluate" in cases:
+            from hate.components.model_evaluation import ModelEvaluation
+
+            model_path = os.path.abspath("benchmark_model.h5")
+            model.save(model_path)
+            x_test = encoder.encode(cleaned[:args.eval_rows])
+            y_test = np.asarray(labels[:args.eval_rows])
+            evaluation_config = ModelEvaluationConfig()
+            # evaluate() only reads the local model file
+            evaluation_config.STORAGE_BACKEND = "local"
+            evaluation = ModelEvaluation(evaluation_config, None, None)
+            times = measure(lambda: evaluation.evaluate(x_test, y_test, model_path, "benchmark"), repeat=args.repeat)
+            results["evaluate"] = summarize(times, rows=len(x_test))
+
+    report = write_results(output, params, results)
+    for case, result in report["results"].items():
+        throughput = f"{result['rows_per_s']:>12,.0f} rows/s" if result.get("rows_per_s") else ""
+        latency = f"  p50 {result['p50_s'] * 1000:.2f}ms p99 {result['p99_s'] * 1000:.2f}ms" if "p50_s" in result else ""
+        print(f"{case:<30} {result['median_s']:9.3f}s {throughput}{latency}")
+    print(f"results written to {output}")
+    return report
+
+
+def compare(args) -> int:
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    # Which cases ran and how often does not change what one case measures
+    differing = {key for key in set(baseline["params"]) | set(current["params"])
+                 if key not in ("case", "repeat") and baseline["params"].get(key) != current["params"].get(key)}
+    if differing:
+        print(f"warning: runs used different parameters ({', '.join(sorted(differing))}), "
+              f"timings may not be comparable")
+
+    rows = compare_results(baseline, current, threshold=args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<30} {row['metric']:<9} {row['baseline']:10.4f}s -> {row['current']:10.4f}s "
+              f"{row['change']:+7.1%} {flag}")
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--case", action="append", choices=CASES, help="case to run, repeatable (default: all)")
+    run_parser.add_argument("--rows", type=int, default=20000, help="corpus size")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--vocabulary-size", type=int, default=20000)
+    run_parser.add_argument("--mean-tokens", type=float, default=14.0, help="mean tokens per tweet")
+    run_parser.add_argument("--max-tokens", type=int, default=60, help="longest tweet in tokens")
+    run_parser.add_argument("--duplicate-rate", type=float, default=0.1, help="share of rows repeating an earlier row")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--runtime", choices=("keras", "tflite", "numpy"), default="numpy",
+                            help="serving model used by the prediction cases")
+    run_parser.add_argument("--predict-rows", type=int, default=500, help="texts sent through the prediction cases")
+    run_parser.add_argument("--batch-size", type=int, default=64, help="texts per predict_batch call")
+    run_parser.add_argument("--eval-rows", type=int, default=5000, help="test rows scored by evaluate")
+    run_parser.add_argument("--workdir", default=None, help="scratch directory, a new temporary one by default")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 = 10%%")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Microbenchmark: original per-call clean_text vs the compiled TextCleaner.
+
+    python benchmarks/bench_text_cleaner.py --rows 20000
+
+Checks that both produce byte-identical output on the generated corpus before
+reporting timings.
+"""
+import os
+import re
+import sys
+import time
+import random
+import string
+import argparse
+import nltk
+from nltk.corpus import stopwords
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hate.ml.text_cleaner import TextCleaner
+
+
+def legacy_clean_text(text):
+    # Original DataTransformation.concat_data_cleaning implementation
+    stemmer = nltk.SnowballStemmer("english")
+    stopword = set(stopwords.words('english'))
+    text = str(text).lower()
+    text = re.sub(r'\[.*?\]', '', text)
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'<.*?>+', '', text)
+    text = re.sub('[%s]' % re.escape(string.punctuation), '', text)
+    text = re.sub('\n', '', text)
+    text = re.sub(r'\w*\d\w*', '', text)
+    text = [word for word in text.split(' ') if word not in stopword]
+    text = " ".join(text)
+    text = [stemmer.stem(word) for word in text.split(' ')]
+    return " ".join(text)
+
+
+WORDS = ("you are the worst people ever seen running hating loving trash bitch "
+         "amazing game tonight retweet follow lol lmao what is this nonsense "
+         "&amp; RT he she they them it's don't won't can't").split()
+EXTRAS = ["@user123", "#hashtag", "http://t.co/abc123", "https://example.com/x?y=1",
+          "www.site.org", "[removed]", "<b>", "</b>", "&#8220;", "2nd", "100%", "\n", "!!!", "..."]
+
+
+def make_corpus(rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(rows):
+        tokens = [rng.choice(WORDS) if rng.random() > 0.2 else rng.choice(EXTRAS)
+                  for _ in range(rng.randint(3, 30))]
+        corpus.append(" ".join(tokens))
+    return corpus
+
+
+def bench(fn, corpus):
+    start = time.perf_counter()
+    out = [fn(text) for text in corpus]
+    return time.perf_counter() - start, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.rows, args.seed)
+    cleaner = TextCleaner()
+
+    legacy_time, legacy_out = bench(legacy_clean_text, corpus)
+    cleaner_time, cleaner_out = bench(cleaner.clean, corpus)
+
+    mismatches = sum(a != b for a, b in zip(legacy_out, cleaner_out))
+    if mismatches:
+        raise SystemExit(f"{mismatches} rows differ between the legacy cleaner and TextCleaner")
+
+    print(f"rows                : {args.rows}")
+    print(f"legacy clean_text   : {legacy_time:.3f}s ({args.rows / legacy_time:,.0f} rows/s)")
+    print(f"TextCleaner         : {cleaner_time:.3f}s ({args.rows / cleaner_time:,.0f} rows/s)")
+    print(f"speedup             : {legacy_time / cleaner_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
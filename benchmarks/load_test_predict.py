@@ -0,0 +1,93 @@
+"""
+Load test for a running prediction service.
+
+    python app.py &
+    python benchmarks/load_test_predict.py --url http://127.0.0.1:8080 --clients 32 --requests 2000
+
+Fires POST /predict from parallel clients and reports throughput and p50/p90/p99
+latency. Pass --batch N to exercise POST /predict_batch with N texts per request.
+"""
+import json
+import time
+import random
+import argparse
+import statistics
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+TEXTS = [
+    "you are the worst human being alive",
+    "what a lovely day at the beach with friends",
+    "RT @user: this game was trash, refs were blind",
+    "I hate mondays so much lol",
+    "go back to where you came from, nobody wants you here",
+    "congrats on the new job!! so proud of you",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def send(url: str, batch: int, timeout: float):
+    if batch:
+        body = json.dumps({"texts": random.choices(TEXTS, k=batch)}).encode()
+        request = urllib.request.Request(f"{url}/predict_batch", data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+    else:
+        query = urllib.parse.urlencode({"text": random.choice(TEXTS)})
+        request = urllib.request.Request(f"{url}/predict?{query}", data=b"", method="POST")
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the prediction service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--clients", type=int, default=32, help="parallel clients")
+    parser.add_argument("--requests", type=int, default=1000, help="total requests")
+    parser.add_argument("--batch", type=int, default=0, help="texts per /predict_batch request, 0 uses /predict")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    # Warm up so the model load is not part of the measurement
+    send(url, args.batch, args.timeout)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        results = list(executor.map(lambda _: send(url, args.batch, args.timeout), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for latency, status in results if status == 200]
+    errors = {}
+    for _, status in results:
+        if status != 200:
+            errors[status] = errors.get(status, 0) + 1
+
+    texts = args.requests * (args.batch or 1)
+    print(f"endpoint     : {'/predict_batch' if args.batch else '/predict'}")
+    print(f"clients      : {args.clients}")
+    print(f"requests     : {args.requests} in {elapsed:.2f}s ({args.requests / elapsed:,.1f} req/s, {texts / elapsed:,.1f} texts/s)")
+    if latencies:
+        print(f"latency (ms) : p50 {percentile(latencies, 50):.1f}  p90 {percentile(latencies, 90):.1f}  "
+              f"p99 {percentile(latencies, 99):.1f}  max {max(latencies):.1f}  mean {statistics.mean(latencies):.1f}")
+    if errors:
+        print(f"errors       : {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import os
 import sys
+import shutil
 from zipfile import ZipFile
+from hate.utils.instrumentation import timed
 from hate.logger import logging
 from hate.exception import CustomException
-from hate.configuration.gcloud_syncer import GCloudSync
+from hate.configuration.storage import get_storage
+from hate.utils.fingerprint import file_digest
 from hate.entity.config_entity import DataIngestionConfig
 from hate.entity.artifact_entity import DataIngestionArtifacts
 
@@ -11,8 +14,9 @@ from hate.entity.artifact_entity import DataIngestionArtifacts
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig):
         self.data_ingestion_config = data_ingestion_config
-        self.gcloud = GCloudSync()
+        self.storage = get_storage(data_ingestion_config.STORAGE_BACKEND)
 
+    @timed()
     def get_data_from_gcloud(self) -> None:
         try:
             logging.info("Entered the get_data_from_gcloud method of DataIngestion class")
@@ -21,12 +25,12 @@ class DataIngestion:
             logging.info(f"Creating directory: {self.data_ingestion_config.DATA_INGESTION_ARTIFACTS_DIR}")
             os.makedirs(self.data_ingestion_config.DATA_INGESTION_ARTIFACTS_DIR, exist_ok=True)
 
-            # Sync data from GCloud
+            # Sync data from the storage backend
             logging.info(f"Syncing {self.data_ingestion_config.ZIP_FILE_NAME} from bucket {self.data_ingestion_config.BUCKET_NAME} "
                          f"to {self.data_ingestion_config.DATA_INGESTION_ARTIFACTS_DIR}")
-            self.gcloud.sync_folder_from_gcloud(self.data_ingestion_config.BUCKET_NAME,
-                                                self.data_ingestion_config.ZIP_FILE_NAME,
-                                                self.data_ingestion_config.DATA_INGESTION_ARTIFACTS_DIR)
+            self.storage.get(self.data_ingestion_config.BUCKET_NAME,
+                             self.data_ingestion_config.ZIP_FILE_NAME,
+                             self.data_ingestion_config.DATA_INGESTION_ARTIFACTS_DIR)
             
             # Verify if file exists
             zip_file_path = self.data_ingestion_config.ZIP_FILE_PATH
@@ -41,6 +45,33 @@ class DataIngestion:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def _data_members(self):
+        return [os.path.basename(self.data_ingestion_config.DATA_ARTIFACTS_DIR),
+                os.path.basename(self.data_ingestion_config.NEW_DATA_ARTIFACTS_DIR)]
+
+    def _check_members(self, archive: ZipFile, source: str):
+        missing = [member for member in self._data_members() if member not in archive.namelist()]
+        if missing:
+            raise FileNotFoundError(f"{missing} not found in {source}")
+
+    @staticmethod
+    def _link_or_copy(source: str, target: str):
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            # Hard link when the cache shares the file system, nothing is copied
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+    def _prune_extracted(self, keep: str):
+        # Only the latest archive's extraction is worth keeping around
+        cache_dir = self.data_ingestion_config.EXTRACTED_DATA_CACHE_DIR
+        for entry in os.listdir(cache_dir):
+            if entry != keep and not entry.endswith(".part"):
+                shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+
+    @timed()
     def unzip_and_clean(self):
         logging.info("Entered the unzip_and_clean method of DataIngestion class")
         zip_file_path = self.data_ingestion_config.ZIP_FILE_PATH
@@ -51,11 +82,24 @@ class DataIngestion:
             if not os.path.exists(zip_file_path):
                 logging.error(f"ZIP file does not exist at {zip_file_path}")
                 raise FileNotFoundError(f"ZIP file not found at {zip_file_path}")
-            
-            logging.info(f"Unzipping {zip_file_path} to {zip_file_dir}")
-            with ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(zip_file_dir)
-            
+
+            # Archives are extracted once per content hash and reused by later runs
+            archive_hash = file_digest(zip_file_path)
+            extracted_dir = os.path.join(self.data_ingestion_config.EXTRACTED_DATA_CACHE_DIR, archive_hash)
+            if os.path.isdir(extracted_dir):
+                logging.info(f"Archive {archive_hash} was already extracted to {extracted_dir}, skipping extraction")
+            else:
+                logging.info(f"Unzipping {zip_file_path} to {extracted_dir}")
+                tmp_dir = f"{extracted_dir}.{os.getpid()}.part"
+                with ZipFile(zip_file_path, 'r') as zip_ref:
+                    self._check_members(zip_ref, zip_file_path)
+                    zip_ref.extractall(tmp_dir, members=self._data_members())
+                os.replace(tmp_dir, extracted_dir)
+                self._prune_extracted(archive_hash)
+
+            for member in self._data_members():
+                self._link_or_copy(os.path.join(extracted_dir, member), os.path.join(zip_file_dir, member))
+
             # Verify extracted files
             extracted_files = os.listdir(zip_file_dir)
             if extracted_files:
@@ -71,10 +115,38 @@ class DataIngestion:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def archive_ingestion_artifacts(self) -> DataIngestionArtifacts:
+        """
+        Point the transformation stage at the csv members inside the archive instead
+        of extracting them; in remote mode the archive is read from storage directly.
+        """
+        try:
+            config = self.data_ingestion_config
+            imbalance_member, raw_member = self._data_members()
+            if config.INGESTION_MODE == "remote":
+                logging.info(f"Streaming {config.ZIP_FILE_NAME} members from bucket {config.BUCKET_NAME}")
+                with self.storage.open(config.BUCKET_NAME, config.ZIP_FILE_NAME) as f, ZipFile(f) as archive:
+                    self._check_members(archive, config.ZIP_FILE_NAME)
+                return DataIngestionArtifacts(imbalance_member, raw_member,
+                                              archive_path=config.ZIP_FILE_NAME, archive_bucket=config.BUCKET_NAME)
+
+            self.get_data_from_gcloud()
+            logging.info(f"Streaming members of {config.ZIP_FILE_PATH} without extracting them")
+            with ZipFile(config.ZIP_FILE_PATH) as archive:
+                self._check_members(archive, config.ZIP_FILE_PATH)
+            return DataIngestionArtifacts(imbalance_member, raw_member, archive_path=config.ZIP_FILE_PATH)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def initiate_data_ingestion(self) -> DataIngestionArtifacts:
         logging.info("Entered the initiate_data_ingestion method of DataIngestion class")
 
         try:
+            if self.data_ingestion_config.INGESTION_MODE in ("archive", "remote"):
+                data_ingestion_artifacts = self.archive_ingestion_artifacts()
+                logging.info(f"Data ingestion artifacts created: {data_ingestion_artifacts}")
+                return data_ingestion_artifacts
+
             # Fetch data from GCloud
             self.get_data_from_gcloud()
             logging.info("Successfully fetched data from GCloud")
@@ -1,14 +1,16 @@
 import os
-import re
 import sys
-import string
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-nltk.download('stopwords')
-from sklearn.model_selection import train_test_split
+import multiprocessing
+from zipfile import ZipFile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from hate.utils.instrumentation import timed
 from hate.logger import logging 
 from hate.exception import CustomException
+from hate.ml.text_cleaner import get_text_cleaner, clean_texts
+from hate.configuration.storage import get_storage
+from hate.utils.artifact_io import FrameWriter, write_frame
 from hate.entity.config_entity import DataTransformationConfig
 from hate.entity.artifact_entity import DataIngestionArtifacts, DataTransformationArtifacts
 
@@ -18,15 +20,53 @@ class DataTransformation:
         self.data_transformation_config = data_transformation_config
         self.data_ingestion_artifacts = data_ingestion_artifacts
 
+    @contextmanager
+    def open_source(self, path: str):
+        """
+        Yield something pd.read_csv can read for an ingestion path: the path itself,
+        or the matching member streamed out of the ingestion archive.
+        """
+        archive_path = self.data_ingestion_artifacts.archive_path
+        if not archive_path:
+            yield path
+            return
+
+        archive_bucket = self.data_ingestion_artifacts.archive_bucket
+        if archive_bucket:
+            archive_file = get_storage(self.data_transformation_config.STORAGE_BACKEND).open(archive_bucket, archive_path)
+        else:
+            archive_file = open(archive_path, "rb")
+        with archive_file, ZipFile(archive_file) as archive, archive.open(path) as member:
+            yield member
+
+    def clean_imbalance_frame(self, imbalance_data: pd.DataFrame) -> pd.DataFrame:
+        imbalance_data.drop(
+            self.data_transformation_config.ID,
+            axis=self.data_transformation_config.AXIS,
+            inplace=self.data_transformation_config.INPLACE
+        )
+        return imbalance_data
+
+    def clean_raw_frame(self, raw_data: pd.DataFrame) -> pd.DataFrame:
+        raw_data.drop(
+            self.data_transformation_config.DROP_COLUMNS,
+            axis=self.data_transformation_config.AXIS,
+            inplace=self.data_transformation_config.INPLACE
+        )
+        # Avoid chained assignment by explicitly assigning back to the column
+        raw_data[self.data_transformation_config.CLASS] = raw_data[self.data_transformation_config.CLASS].replace({0: 1, 2: 0})
+        raw_data.rename(
+            columns={self.data_transformation_config.CLASS: self.data_transformation_config.LABEL},
+            inplace=True
+        )
+        return raw_data
+
     def imbalance_data_cleaning(self):
         try:
             logging.info("Cleaning imbalance data...")
-            imbalance_data = pd.read_csv(self.data_ingestion_artifacts.imbalance_data_file_path)
-            imbalance_data.drop(
-                self.data_transformation_config.ID,
-                axis=self.data_transformation_config.AXIS,
-                inplace=self.data_transformation_config.INPLACE
-            )
+            with self.open_source(self.data_ingestion_artifacts.imbalance_data_file_path) as source:
+                imbalance_data = pd.read_csv(source)
+            imbalance_data = self.clean_imbalance_frame(imbalance_data)
             logging.info("Imbalance data cleaning completed.")
             return imbalance_data
         except Exception as e:
@@ -35,24 +75,16 @@ class DataTransformation:
     def raw_data_cleaning(self):
         try:
             logging.info("Cleaning raw data...")
-            raw_data = pd.read_csv(self.data_ingestion_artifacts.raw_data_file_path)
-            raw_data.drop(
-                self.data_transformation_config.DROP_COLUMNS,
-                axis=self.data_transformation_config.AXIS,
-                inplace=self.data_transformation_config.INPLACE
-            )
-            # Avoid chained assignment by explicitly assigning back to the column
-            raw_data[self.data_transformation_config.CLASS] = raw_data[self.data_transformation_config.CLASS].replace({0: 1, 2: 0})
-            raw_data.rename(
-                columns={self.data_transformation_config.CLASS: self.data_transformation_config.LABEL},
-                inplace=True
-            )
+            with self.open_source(self.data_ingestion_artifacts.raw_data_file_path) as source:
+                raw_data = pd.read_csv(source)
+            raw_data = self.clean_raw_frame(raw_data)
             logging.info("Raw data cleaning completed.")
             return raw_data
         except Exception as e:
             raise CustomException(e, sys) from e
 
 
+    @timed()
     def concat_dataframe(self):
         try:
             logging.info("Concatenating dataframes...")
@@ -65,23 +97,80 @@ class DataTransformation:
 
     def concat_data_cleaning(self, words):
         try:
-            # Internal function for actual cleaning logic (no logs here)
-            def clean_text(text):
-                stemmer = nltk.SnowballStemmer("english")
-                stopword = set(stopwords.words('english'))
-                text = str(text).lower()
-                text = re.sub('\[.*?\]', '', text)
-                text = re.sub('https?://\S+|www\.\S+', '', text)
-                text = re.sub('<.*?>+', '', text)
-                text = re.sub('[%s]' % re.escape(string.punctuation), '', text)
-                text = re.sub('\n', '', text)
-                text = re.sub('\w*\d\w*', '', text)
-                text = [word for word in text.split(' ') if word not in stopword]
-                text = " ".join(text)
-                text = [stemmer.stem(word) for word in text.split(' ')]
-                return " ".join(text)
-
-            return clean_text(words)
+            # The cleaner is built once per process, not on every call
+            return get_text_cleaner().clean(words)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def _n_jobs(self) -> int:
+        n_jobs = self.data_transformation_config.N_JOBS
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = os.cpu_count() or 1
+        return n_jobs
+
+    def _process_pool(self, n_jobs: int) -> ProcessPoolExecutor:
+        # spawn keeps TensorFlow state loaded in the parent out of the workers
+        return ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"))
+
+    @timed(rows_arg="tweets")
+    def clean_tweets(self, tweets: pd.Series, executor: ProcessPoolExecutor = None) -> pd.Series:
+        try:
+            n_jobs = self._n_jobs()
+            chunk_size = self.data_transformation_config.CHUNK_SIZE
+
+            if (executor is None and n_jobs == 1) or len(tweets) <= chunk_size:
+                return tweets.apply(self.concat_data_cleaning)
+
+            chunks = [tweets.iloc[start:start + chunk_size].tolist() for start in range(0, len(tweets), chunk_size)]
+            logging.info(f"Cleaning {len(tweets)} rows in {len(chunks)} chunks with {n_jobs} worker processes")
+
+            # executor.map returns the chunks in submission order
+            if executor is not None:
+                cleaned = [text for chunk in executor.map(clean_texts, chunks) for text in chunk]
+            else:
+                with self._process_pool(min(n_jobs, len(chunks))) as executor:
+                    cleaned = [text for chunk in executor.map(clean_texts, chunks) for text in chunk]
+
+            return pd.Series(cleaned, index=tweets.index, name=tweets.name)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def stream_data_transformation(self) -> int:
+        """
+        Read both ingestion files in READ_CHUNK_SIZE row chunks, clean each chunk
+        and append it to the transformed file, so memory stays bounded by one chunk.
+        Returns the number of rows written.
+        """
+        try:
+            config = self.data_transformation_config
+            sources = [
+                (self.data_ingestion_artifacts.raw_data_file_path, self.clean_raw_frame),
+                (self.data_ingestion_artifacts.imbalance_data_file_path, self.clean_imbalance_frame),
+            ]
+            n_jobs = self._n_jobs()
+            executor = self._process_pool(n_jobs) if n_jobs > 1 else None
+            columns = None
+            try:
+                with FrameWriter(config.TRANSFORMED_FILE_PATH, config.ARTIFACT_FORMAT) as writer:
+                    for file_path, clean_frame in sources:
+                        logging.info(f"Streaming {file_path} in chunks of {config.READ_CHUNK_SIZE} rows")
+                        with self.open_source(file_path) as source:
+                            for chunk in pd.read_csv(source, chunksize=config.READ_CHUNK_SIZE):
+                                chunk = clean_frame(chunk)
+                                # Keep the column order of the first source, as pd.concat does
+                                if columns is None:
+                                    columns = list(chunk.columns)
+                                else:
+                                    chunk = chunk.reindex(columns=columns)
+                                chunk[config.TWEET] = self.clean_tweets(chunk[config.TWEET], executor=executor)
+                                writer.write(chunk)
+                rows = writer.rows
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+
+            logging.info(f"Streamed {rows} transformed rows to {config.TRANSFORMED_FILE_PATH}")
+            return rows
         except Exception as e:
             raise CustomException(e, sys) from e
 
@@ -89,21 +178,26 @@ class DataTransformation:
     def initiate_data_transformation(self) -> DataTransformationArtifacts:
         try:
             logging.info("Starting data transformation process...")
-            df = self.concat_dataframe()
+            os.makedirs(self.data_transformation_config.DATA_TRANSFORMATION_ARTIFACTS_DIR, exist_ok=True)
 
-            # Log before and after applying the cleaning function
-            logging.info("Applying text cleaning to the entire dataframe...")
-            df[self.data_transformation_config.TWEET] = df[self.data_transformation_config.TWEET].apply(
-                self.concat_data_cleaning
-            )
-            logging.info("Text cleaning completed for the entire dataframe.")
+            if self.data_transformation_config.STREAMING:
+                logging.info("Applying text cleaning chunk by chunk in streaming mode...")
+                self.stream_data_transformation()
+            else:
+                df = self.concat_dataframe()
 
-            os.makedirs(self.data_transformation_config.DATA_TRANSFORMATION_ARTIFACTS_DIR, exist_ok=True)
-            df.to_csv(self.data_transformation_config.TRANSFORMED_FILE_PATH, index=False, header=True)
+                # Log before and after applying the cleaning function
+                logging.info("Applying text cleaning to the entire dataframe...")
+                df[self.data_transformation_config.TWEET] = self.clean_tweets(df[self.data_transformation_config.TWEET])
+                logging.info("Text cleaning completed for the entire dataframe.")
+
+                write_frame(df, self.data_transformation_config.TRANSFORMED_FILE_PATH,
+                            self.data_transformation_config.ARTIFACT_FORMAT)
 
             logging.info("Data transformation process completed. Saving transformed data.")
             data_transformation_artifact = DataTransformationArtifacts(
-                transformed_data_path=self.data_transformation_config.TRANSFORMED_FILE_PATH
+                transformed_data_path=self.data_transformation_config.TRANSFORMED_FILE_PATH,
+                artifact_format=self.data_transformation_config.ARTIFACT_FORMAT
             )
             logging.info("Returning DataTransformationArtifacts.")
             return data_transformation_artifact
@@ -2,13 +2,16 @@ import os
 import sys
 import keras
 import pickle
-import pandas as pd
-from keras.utils import pad_sequences
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.metrics import confusion_matrix
+from hate.utils.instrumentation import timed, span
 from hate.logger import logging
 from hate.exception import CustomException
 from hate.constants import *
-from hate.configuration.gcloud_syncer import GCloudSync
+from hate.configuration.storage import get_storage
+from hate.utils.artifact_io import read_frame, read_array
+from hate.ml.sequence_encoder import SequenceEncoder
 from hate.entity.config_entity import ModelEvaluationConfig
 from hate.entity.artifact_entity import ModelEvaluationArtifacts, ModelTrainerArtifacts, DataTransformationArtifacts
 
@@ -20,31 +23,47 @@ class ModelEvaluation:
         self.model_evaluation_config = model_evaluation_config
         self.model_trainer_artifacts = model_trainer_artifacts
         self.data_transformation_artifacts = data_transformation_artifacts
-        self.gcloud = GCloudSync()
+        self.storage = get_storage(model_evaluation_config.STORAGE_BACKEND)
 
+    @timed()
     def get_best_model_from_gcloud(self) -> str:
         try:
             logging.info("[GCLOUD] Fetching the best model from GCloud storage")
             os.makedirs(self.model_evaluation_config.BEST_MODEL_DIR_PATH, exist_ok=True)
+            best_model_path = os.path.join(self.model_evaluation_config.BEST_MODEL_DIR_PATH,
+                                           self.model_evaluation_config.MODEL_NAME)
+
+            if not self.storage.exists(self.model_evaluation_config.BUCKET_NAME,
+                                       self.model_evaluation_config.MODEL_NAME):
+                # First run against this bucket, there is no model to compare with yet
+                logging.info("[GCLOUD] No best model in storage yet")
+                return best_model_path
 
-            self.gcloud.sync_folder_from_gcloud(
+            self.storage.get(
                 self.model_evaluation_config.BUCKET_NAME,
                 self.model_evaluation_config.MODEL_NAME,
                 self.model_evaluation_config.BEST_MODEL_DIR_PATH
             )
-
-            best_model_path = os.path.join(self.model_evaluation_config.BEST_MODEL_DIR_PATH,
-                                           self.model_evaluation_config.MODEL_NAME)
             logging.info(f"[GCLOUD] Best model fetched: {best_model_path}")
             return best_model_path
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    @timed()
     def preprocess_data(self):
         try:
+            x_test_sequences_path = self.model_trainer_artifacts.x_test_sequences_path
+            y_test_labels_path = self.model_trainer_artifacts.y_test_labels_path
+            if (x_test_sequences_path and y_test_labels_path
+                    and os.path.exists(x_test_sequences_path) and os.path.exists(y_test_labels_path)):
+                # Already tokenized by the trainer, memory-map instead of re-tokenizing
+                logging.info("[PREPROCESS] Memory-mapping tokenized x_test and y_test")
+                return read_array(x_test_sequences_path), read_array(y_test_labels_path)
+
             logging.info("[PREPROCESS] Loading x_test and y_test data")
-            x_test = pd.read_csv(self.model_trainer_artifacts.x_test_path)
-            y_test = pd.read_csv(self.model_trainer_artifacts.y_test_path)
+            artifact_format = self.model_trainer_artifacts.artifact_format
+            x_test = read_frame(self.model_trainer_artifacts.x_test_path, artifact_format)
+            y_test = read_frame(self.model_trainer_artifacts.y_test_path, artifact_format)
 
             logging.info("[PREPROCESS] Validating column names in x_test")
             x_test.columns = x_test.columns.str.strip()
@@ -65,26 +84,35 @@ class ModelEvaluation:
                 tokenizer = pickle.load(handle)
 
             logging.info("[PREPROCESS] Tokenizing and padding x_test")
-            test_sequences = tokenizer.texts_to_sequences(x_test['tweet'])
-            test_sequences_matrix = pad_sequences(test_sequences, maxlen=MAX_LEN)
+            test_sequences_matrix = SequenceEncoder.from_tokenizer(tokenizer, max_len=MAX_LEN).encode(x_test['tweet'].tolist())
 
             return test_sequences_matrix, y_test
         except Exception as e:
             raise CustomException(e, sys) from e
 
     def evaluate(self, x_test, y_test, model_path: str, model_type: str):
+        """
+        Score a model with one prediction pass over x_test.
+        Returns ([loss, accuracy], confusion), the loss and accuracy model.evaluate would report.
+        """
         try:
-            logging.info(f"[{model_type}] Loading model from {model_path}")
-            model = keras.models.load_model(model_path)
-
-            logging.info(f"[{model_type}] Evaluating the model")
-            accuracy = model.evaluate(x_test, y_test, verbose=1)
+            with span(f"evaluate[{model_type}]", rows=len(x_test)):
+                logging.info(f"[{model_type}] Loading model from {model_path}")
+                model = keras.models.load_model(model_path)
+
+                logging.info(f"[{model_type}] Predicting on the test data")
+                scores = model.predict(x_test, batch_size=self.model_evaluation_config.BATCH_SIZE, verbose=0)[:, 0]
+            labels = np.asarray(y_test).reshape(-1).astype(np.float64)
+
+            # binary_crossentropy and binary_accuracy, derived from the same predictions
+            clipped = np.clip(scores.astype(np.float64), 1e-7, 1 - 1e-7)
+            loss = float(-np.mean(labels * np.log(clipped) + (1 - labels) * np.log(1 - clipped)))
+            accuracy = [loss, float(np.mean((scores > 0.5) == labels))]
             logging.info(f"[{model_type}] Accuracy on test data: {accuracy}")
 
             logging.info(f"[{model_type}] Generating confusion matrix")
-            predictions = model.predict(x_test)
-            predictions = [0 if pred[0] < 0.5 else 1 for pred in predictions]
-            confusion = confusion_matrix(y_test, predictions)
+            predictions = (scores >= 0.5).astype(int)
+            confusion = confusion_matrix(labels.astype(int), predictions)
             logging.info(f"[{model_type}] Confusion matrix:\n{confusion}")
 
             return accuracy, confusion
@@ -99,24 +127,30 @@ class ModelEvaluation:
             x_test, y_test = self.preprocess_data()
 
             trained_model_path = self.model_trainer_artifacts.trained_model_path
-            logging.info("[EVALUATION] Evaluating the trained model")
-            trained_model_accuracy, trained_confusion = self.evaluate(
-                x_test, y_test, model_path=trained_model_path, model_type="TRAINED MODEL"
-            )
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="evaluation") as executor:
+                # The incumbent downloads while the candidate is scored, then both score concurrently
+                logging.info("[EVALUATION] Fetching the best model from GCloud storage")
+                best_model_future = executor.submit(self.get_best_model_from_gcloud)
 
-            logging.info("[EVALUATION] Fetching the best model from GCloud storage")
-            best_model_path = self.get_best_model_from_gcloud()
+                logging.info("[EVALUATION] Evaluating the trained model")
+                trained_future = executor.submit(self.evaluate, x_test, y_test,
+                                                 model_path=trained_model_path, model_type="TRAINED MODEL")
+
+                best_model_path = best_model_future.result()
+                best_future = None
+                if os.path.isfile(best_model_path):
+                    logging.info("[EVALUATION] Evaluating the best model fetched from GCloud")
+                    best_future = executor.submit(self.evaluate, x_test, y_test,
+                                                  model_path=best_model_path, model_type="BEST MODEL FROM GCLOUD")
+
+                trained_model_accuracy, trained_confusion = trained_future.result()
+                best_model_accuracy, best_confusion = best_future.result() if best_future else (None, None)
 
             is_model_accepted = False
-            if not os.path.isfile(best_model_path):
+            if best_model_accuracy is None:
                 logging.info("[EVALUATION] No best model found in GCloud. Accepting the trained model.")
                 is_model_accepted = True
             else:
-                logging.info("[EVALUATION] Evaluating the best model fetched from GCloud")
-                best_model_accuracy, best_confusion = self.evaluate(
-                    x_test, y_test, model_path=best_model_path, model_type="BEST MODEL FROM GCLOUD"
-                )
-
                 logging.info("[EVALUATION] Comparing trained model with the best model")
                 if trained_model_accuracy[1] >= best_model_accuracy[1]:  # Compare based on accuracy
                     is_model_accepted = True
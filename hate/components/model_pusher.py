@@ -1,17 +1,20 @@
 import sys
 from hate.logger import logging
 from hate.exception import CustomException
-from hate.configuration.gcloud_syncer import GCloudSync
+import os
+from hate.configuration.storage import get_storage
 from hate.entity.config_entity import ModelPusherConfig
-from hate.entity.artifact_entity import ModelPusherArtifacts
+from hate.entity.artifact_entity import ModelPusherArtifacts, ModelTrainerArtifacts
 
 class ModelPusher:
-    def __init__(self, model_pusher_config: ModelPusherConfig):
+    def __init__(self, model_pusher_config: ModelPusherConfig, model_trainer_artifacts: ModelTrainerArtifacts = None):
         """
         :param model_pusher_config: Configuration for model pusher
+        :param model_trainer_artifacts: trained model to push, by default the one in this run's artifacts
         """
         self.model_pusher_config = model_pusher_config
-        self.gcloud = GCloudSync()
+        self.model_trainer_artifacts = model_trainer_artifacts
+        self.storage = get_storage(model_pusher_config.STORAGE_BACKEND)
 
     
     
@@ -24,13 +27,30 @@ class ModelPusher:
         """
         logging.info("Entered initiate_model_pusher method of ModelTrainer class")
         try:
-            # Uploading the model to gcloud storage
+            # Uploading the model to the storage backend
 
-            self.gcloud.sync_folder_to_gcloud(self.model_pusher_config.BUCKET_NAME,
-                                              self.model_pusher_config.TRAINED_MODEL_PATH,
-                                              self.model_pusher_config.MODEL_NAME)
+            config = self.model_pusher_config
+            if self.model_trainer_artifacts is not None:
+                # A resumed run may reuse a model trained in an earlier artifacts directory
+                trained_model_path = self.model_trainer_artifacts.trained_model_path
+                inference_files = {config.INFERENCE_MODEL_NAME: self.model_trainer_artifacts.inference_model_path,
+                                   config.INFERENCE_WEIGHTS_NAME: self.model_trainer_artifacts.inference_weights_path}
+            else:
+                trained_model_path = os.path.join(config.TRAINED_MODEL_PATH, config.MODEL_NAME)
+                inference_files = {name: os.path.join(config.TRAINED_MODEL_PATH, name)
+                                   for name in (config.INFERENCE_MODEL_NAME, config.INFERENCE_WEIGHTS_NAME)}
 
-            logging.info("Uploaded best model to gcloud storage")
+            # Serving exports go up before model.h5, whose version the model registry watches
+            bucket_name = config.BUCKET_NAME
+            for name, path in inference_files.items():
+                if path and os.path.isfile(path):
+                    self.storage.put(bucket_name, path, name)
+                else:
+                    # Never leave an older export next to the new model
+                    self.storage.delete(bucket_name, name)
+            self.storage.put(bucket_name, trained_model_path, config.MODEL_NAME)
+
+            logging.info("Uploaded best model to storage")
 
             # Saving the model pusher artifacts
             model_pusher_artifact = ModelPusherArtifacts(
@@ -1,16 +1,22 @@
 import os
 import sys
+import json
 import pickle
-import pandas as pd
+import numpy as np
+from hate.utils.instrumentation import timed, span
 from hate.logger import logging
 from hate.constants import *
 from hate.exception import CustomException
 from sklearn.model_selection import train_test_split
 from keras.preprocessing.text import Tokenizer
 from keras.utils import pad_sequences
+from hate.utils.artifact_io import read_frame, write_frame, write_array, sequence_dtype
 from hate.entity.config_entity import ModelTrainerConfig
 from hate.entity.artifact_entity import ModelTrainerArtifacts, DataTransformationArtifacts
 from hate.ml.model import ModelArchitecture
+from hate.ml.sequence_encoder import SequenceEncoder
+from hate.ml.inference_export import export_tflite, TFLiteModel, check_parity
+from hate.ml.numpy_model import export_numpy_weights, NumpyBiLSTM
 
 
 class ModelTrainer:
@@ -18,11 +24,12 @@ class ModelTrainer:
         self.data_transformation_artifacts = data_transformation_artifacts
         self.model_trainer_config = model_trainer_config
 
+    @timed()
     def spliting_data(self, csv_path):
         try:
             logging.info("Entered the spliting_data function")
             logging.info("Reading the data from path: %s", csv_path)
-            df = pd.read_csv(csv_path, index_col=False)
+            df = read_frame(csv_path)
             
             logging.info("Splitting the data into X (tweets) and Y (labels)")
             x = df[TWEET].fillna('').astype(str)  # Ensure all text data is valid
@@ -37,6 +44,7 @@ class ModelTrainer:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    @timed(rows_arg="x_train")
     def tokenizing(self, x_train):
         try:
             logging.info("Entered the tokenizing function")
@@ -49,7 +57,8 @@ class ModelTrainer:
             sequences = tokenizer.texts_to_sequences(x_train)
             
             logging.info("Padding the sequences to uniform length")
-            sequences_matrix = pad_sequences(sequences, maxlen=self.model_trainer_config.MAX_LEN)
+            sequences_matrix = pad_sequences(sequences, maxlen=self.model_trainer_config.MAX_LEN,
+                                             dtype=sequence_dtype(self.model_trainer_config.MAX_WORDS))
             
             logging.info("Tokenization and padding completed")
             logging.info("Exited the tokenizing function")
@@ -57,6 +66,48 @@ class ModelTrainer:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    @timed()
+    def export_inference_models(self, model, test_sequences_matrix, y_test) -> dict:
+        """
+        Export the serving models (TFLite flatbuffer, numpy weights) and check each
+        against the trained model on the test split. Returns {runtime: path} for the
+        exports that passed, failed ones are removed.
+        """
+        try:
+            config = self.model_trainer_config
+            exports = {}
+            if config.EXPORT_INFERENCE_MODEL:
+                logging.info(f"Exporting inference model to {config.INFERENCE_MODEL_PATH}")
+                export_tflite(model, config.INFERENCE_MODEL_PATH, max_len=config.MAX_LEN,
+                              batch_sizes=config.INFERENCE_EXPORT_BATCH_SIZES, quantize=config.INFERENCE_QUANTIZE)
+                exports["tflite"] = (config.INFERENCE_MODEL_PATH, TFLiteModel)
+            if config.EXPORT_NUMPY_WEIGHTS:
+                logging.info(f"Exporting numpy weights to {config.INFERENCE_WEIGHTS_PATH}")
+                export_numpy_weights(model, config.INFERENCE_WEIGHTS_PATH)
+                exports["numpy"] = (config.INFERENCE_WEIGHTS_PATH, NumpyBiLSTM.load)
+            if not exports:
+                return {}
+
+            keras_scores = model.predict(test_sequences_matrix, batch_size=EVALUATION_BATCH_SIZE, verbose=0)
+            report, passed = {}, {}
+            for runtime, (path, load) in exports.items():
+                parity = check_parity(model, load(path), test_sequences_matrix, y_test,
+                                      tolerance=config.INFERENCE_PARITY_TOLERANCE, keras_scores=keras_scores)
+                parity["model_bytes"] = os.path.getsize(path)
+                report[runtime] = parity
+                logging.info(f"{runtime} inference model parity: {parity}")
+                if parity["passed"]:
+                    passed[runtime] = path
+                else:
+                    logging.warning(f"{runtime} inference model accuracy differs from the trained model, discarding it")
+                    os.remove(path)
+
+            with open(config.INFERENCE_PARITY_PATH, "w") as f:
+                json.dump(report, f, indent=2)
+            return passed
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def initiate_model_trainer(self) -> ModelTrainerArtifacts:
         logging.info("Entered initiate_model_trainer method of ModelTrainer class")
         try:
@@ -73,18 +124,21 @@ class ModelTrainer:
             sequences_matrix, tokenizer = self.tokenizing(x_train)
 
             logging.info("Starting model training")
-            model.fit(
-                sequences_matrix,
-                y_train,
-                batch_size=self.model_trainer_config.BATCH_SIZE,
-                epochs=self.model_trainer_config.EPOCH,
-                validation_split=self.model_trainer_config.VALIDATION_SPLIT,
-            )
+            epochs = self.model_trainer_config.EPOCH
+            with span("model.fit", rows=len(sequences_matrix) * epochs, epochs=epochs):
+                model.fit(
+                    sequences_matrix,
+                    y_train,
+                    batch_size=self.model_trainer_config.BATCH_SIZE,
+                    epochs=epochs,
+                    validation_split=self.model_trainer_config.VALIDATION_SPLIT,
+                )
             logging.info("Model training completed")
 
             logging.info("Saving tokenizer")
             with open('tokenizer.pickle', 'wb') as handle:
                 pickle.dump(tokenizer, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            SequenceEncoder.from_tokenizer(tokenizer, max_len=self.model_trainer_config.MAX_LEN).save(VOCABULARY_FILE_PATH)
 
             os.makedirs(self.model_trainer_config.TRAINED_MODEL_DIR, exist_ok=True)
 
@@ -92,15 +146,33 @@ class ModelTrainer:
             model.save(self.model_trainer_config.TRAINED_MODEL_PATH)
 
             logging.info("Saving test and training data")
-            x_test.to_csv(self.model_trainer_config.X_TEST_DATA_PATH, index=False)
-            y_test.to_csv(self.model_trainer_config.Y_TEST_DATA_PATH, index=False)
-            x_train.to_csv(self.model_trainer_config.X_TRAIN_DATA_PATH, index=False)
+            artifact_format = self.model_trainer_config.ARTIFACT_FORMAT
+            write_frame(x_test, self.model_trainer_config.X_TEST_DATA_PATH, artifact_format)
+            write_frame(y_test, self.model_trainer_config.Y_TEST_DATA_PATH, artifact_format)
+            write_frame(x_train, self.model_trainer_config.X_TRAIN_DATA_PATH, artifact_format)
+
+            # Tokenized matrices let evaluation and retraining skip tokenization entirely
+            logging.info("Saving tokenized train and test sequences")
+            test_sequences_matrix = pad_sequences(tokenizer.texts_to_sequences(x_test),
+                                                  maxlen=self.model_trainer_config.MAX_LEN,
+                                                  dtype=sequence_dtype(self.model_trainer_config.MAX_WORDS))
+            write_array(sequences_matrix, self.model_trainer_config.X_TRAIN_SEQUENCES_PATH)
+            write_array(y_train, self.model_trainer_config.Y_TRAIN_LABELS_PATH, dtype=np.int8)
+            write_array(test_sequences_matrix, self.model_trainer_config.X_TEST_SEQUENCES_PATH)
+            write_array(y_test, self.model_trainer_config.Y_TEST_LABELS_PATH, dtype=np.int8)
+
+            inference_exports = self.export_inference_models(model, test_sequences_matrix, y_test)
 
             logging.info("Creating model trainer artifacts")
             model_trainer_artifacts = ModelTrainerArtifacts(
                 trained_model_path=self.model_trainer_config.TRAINED_MODEL_PATH,
                 x_test_path=self.model_trainer_config.X_TEST_DATA_PATH,
                 y_test_path=self.model_trainer_config.Y_TEST_DATA_PATH,
+                artifact_format=self.model_trainer_config.ARTIFACT_FORMAT,
+                x_test_sequences_path=self.model_trainer_config.X_TEST_SEQUENCES_PATH,
+                y_test_labels_path=self.model_trainer_config.Y_TEST_LABELS_PATH,
+                inference_model_path=inference_exports.get("tflite"),
+                inference_weights_path=inference_exports.get("numpy"),
             )
             
             logging.info("Model trainer artifacts created successfully")
@@ -0,0 +1,155 @@
+import os
+import shutil
+import logging
+import threading
+from collections import Counter
+from typing import Callable
+from hate.constants import *
+
+
+class DownloadCache:
+    """
+    Content addressed store for downloaded bucket objects.
+
+    Blobs live in `<cache_dir>/<key>`, where the key is derived from the object's
+    checksum, so an unchanged object is served from disk instead of downloaded
+    again, whatever path it is later copied to. Least recently used blobs are
+    evicted once the cache grows past `max_bytes`; blobs being served are pinned
+    and never evicted under a running fetch.
+
+    Access times are kept on empty marker files in `<cache_dir>/.access`, not on
+    the blobs: those are hard linked into run artifacts, whose mtimes fingerprint
+    finished stages.
+    """
+
+    def __init__(self, cache_dir: str = DOWNLOAD_CACHE_DIR, max_bytes: int = DOWNLOAD_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # key -> fetches currently serving it
+        self._pinned = Counter()
+        self._lock = threading.Lock()
+        self.access_dir = os.path.join(cache_dir, ".access")
+        os.makedirs(self.access_dir, exist_ok=True)
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _access_path(self, key: str) -> str:
+        return os.path.join(self.access_dir, key)
+
+    def _touch(self, key: str) -> None:
+        """Mark `key` as used now."""
+        with open(self._access_path(key), "a"):
+            pass
+        os.utime(self._access_path(key))
+
+    def _last_access(self, key: str, blob_stat: os.stat_result) -> float:
+        try:
+            return os.stat(self._access_path(key)).st_mtime
+        except FileNotFoundError:
+            # Blob cached before access markers existed
+            return blob_stat.st_mtime
+
+    def fetch(self, key: str, local_path: str, download: Callable[[str], None]) -> bool:
+        """
+        Place the blob `key` at `local_path`, calling `download(path)` only when it is not cached.
+
+        Returns True on a cache hit.
+        """
+        blob_path = self._blob_path(key)
+        with self._lock:
+            hit = os.path.exists(blob_path)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._touch(key)
+            self._pinned[key] += 1
+
+        try:
+            if not hit:
+                self._download(blob_path, download)
+            logging.info(f"[DOWNLOAD CACHE] {'Hit' if hit else 'Miss'} for {key} ({self.stats()})")
+            try:
+                self._materialize(blob_path, local_path)
+            except FileNotFoundError:
+                if not hit:
+                    raise
+                # Evicted by another process sharing the cache directory
+                self._download(blob_path, download)
+                self._materialize(blob_path, local_path)
+            # Still pinned: an object larger than max_bytes stays until a later fetch evicts it
+            self.evict()
+        finally:
+            with self._lock:
+                self._pinned[key] -= 1
+                if not self._pinned[key]:
+                    del self._pinned[key]
+        return hit
+
+    @staticmethod
+    def _download(blob_path: str, download: Callable[[str], None]) -> None:
+        tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            download(tmp_path)
+            os.replace(tmp_path, blob_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _materialize(blob_path: str, local_path: str) -> None:
+        if os.path.exists(local_path) and os.path.samefile(blob_path, local_path):
+            return
+        tmp_path = f"{local_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            # Hard link when the cache shares the file system, the blob is never copied
+            os.link(blob_path, tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, local_path)
+
+    def evict(self) -> None:
+        """Remove least recently used blobs, except pinned ones, until the cache fits in `max_bytes`."""
+        with self._lock:
+            blobs = []
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.startswith(".") or file_name.endswith(".part"):
+                    continue
+                try:
+                    stat = os.stat(self._blob_path(file_name))
+                except FileNotFoundError:
+                    continue
+                blobs.append((self._last_access(file_name, stat), stat.st_size, file_name))
+
+            total = sum(size for _, size, _ in blobs)
+            for _, size, file_name in sorted(blobs):
+                if total <= self.max_bytes:
+                    break
+                if file_name in self._pinned:
+                    continue
+                logging.info(f"[DOWNLOAD CACHE] Evicting {file_name} ({size} bytes)")
+                os.remove(self._blob_path(file_name))
+                if os.path.exists(self._access_path(file_name)):
+                    os.remove(self._access_path(file_name))
+                total -= size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+_download_cache = None
+_download_cache_lock = threading.Lock()
+
+
+def get_download_cache() -> DownloadCache:
+    """Return the process wide download cache."""
+    global _download_cache
+    with _download_cache_lock:
+        if _download_cache is None:
+            _download_cache = DownloadCache()
+        return _download_cache
@@ -1,49 +1,171 @@
 import os
+import base64
 import logging
-import subprocess
+import threading
+from hate.constants import *
+from hate.configuration.storage import Storage
+from hate.configuration.download_cache import DownloadCache, get_download_cache
 
-class GCloudSync:
+_storage_client = None
+_storage_client_lock = threading.Lock()
 
-    def sync_folder_to_gcloud(self, gcp_bucket_url, filepath, filename):
-        try:
-            # Ensure filepath ends correctly
-            filepath = os.path.join(filepath, filename)
 
-            # Ensure the file exists
-            if not os.path.isfile(filepath):
-                raise FileNotFoundError(f"File not found: {filepath}")
+def build_http_session(credentials, pool_size: int = GCS_CONNECTION_POOL_SIZE):
+    """Authorized requests session whose connection pool fits `pool_size` concurrent transfers."""
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    session = AuthorizedSession(credentials)
+    # Parallel chunked transfers share the session, size its pool to match
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-            # Construct the command
-            command = f'gsutil cp "{filepath}" gs://{gcp_bucket_url}/'
-            logging.info(f"Executing command: {command}")
 
-            # Use subprocess for better error handling and logging
-            result = subprocess.run(command, shell=True, capture_output=True, text=True)
+def get_storage_client():
+    """
+    Return the process wide google-cloud-storage client.
 
-            # Log the result
-            if result.returncode == 0:
-                logging.info(f"Successfully uploaded {filename} to gs://{gcp_bucket_url}/")
+    The client is created once and reused, so its HTTP session keeps connections to
+    GCS open between transfers. Set STORAGE_EMULATOR_HOST to point it at a fake GCS
+    server (e.g. fake-gcs-server or gcp-storage-emulator) instead of the real service.
+    """
+    global _storage_client
+    with _storage_client_lock:
+        if _storage_client is None:
+            from google.cloud import storage
+
+            if os.environ.get("STORAGE_EMULATOR_HOST"):
+                from google.auth.credentials import AnonymousCredentials
+                credentials, project = AnonymousCredentials(), GCS_EMULATOR_PROJECT
             else:
-                logging.error(f"Failed to upload {filename} to gs://{gcp_bucket_url}/. Command: {command} Output: {result.stdout} Error: {result.stderr}")
-                raise Exception(f"gsutil cp failed: {result.stderr}")
+                import google.auth
+                credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+
+            _storage_client = storage.Client(project=project, credentials=credentials,
+                                             _http=build_http_session(credentials))
+        return _storage_client
+
+
+def blob_cache_key(blob) -> str:
+    """Content address of a bucket object: its MD5, else CRC32C and size, else its generation."""
+    if blob.md5_hash:
+        return f"md5-{base64.b64decode(blob.md5_hash).hex()}"
+    if blob.crc32c:
+        # Composite objects carry no MD5
+        return f"crc32c-{base64.b64decode(blob.crc32c).hex()}-{blob.size}"
+    return f"gen-{blob.bucket.name}-{blob.name.replace('/', '_')}-{blob.generation}"
+
+
+class GCloudSync(Storage):
+    """
+    Copies files between the local disk and a GCS bucket with the native client.
+
+    Files of at least `parallel_threshold` bytes are transferred in `chunk_size`
+    pieces by `max_workers` threads (a multipart upload, ranged downloads);
+    smaller files use a single request. Downloads go through the content
+    addressed `cache`, so unchanged objects are not fetched again.
+    """
+
+    def __init__(self, client=None, max_workers: int = GCS_TRANSFER_WORKERS,
+                 chunk_size: int = GCS_TRANSFER_CHUNK_SIZE, parallel_threshold: int = GCS_PARALLEL_THRESHOLD,
+                 cache: DownloadCache = None):
+        self._client = client
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        if cache is None and DOWNLOAD_CACHE_ENABLED:
+            cache = get_download_cache()
+        self.cache = cache
+
+    @property
+    def client(self):
+        return self._client or get_storage_client()
+
+    def _get_blob(self, gcp_bucket_url, filename):
+        blob = self.client.bucket(gcp_bucket_url).get_blob(filename)
+        if blob is None:
+            raise FileNotFoundError(f"Object not found: gs://{gcp_bucket_url}/{filename}")
+        return blob
+
+    def put(self, bucket: str, local_path: str, name: str = None) -> None:
+        from google.cloud.storage import transfer_manager
+
+        try:
+            # Ensure the file exists
+            if not os.path.isfile(local_path):
+                raise FileNotFoundError(f"File not found: {local_path}")
+
+            name = name or os.path.basename(local_path)
+            blob = self.client.bucket(bucket).blob(name)
+            size = os.path.getsize(local_path)
+            logging.info(f"Uploading {local_path} ({size} bytes) to gs://{bucket}/{name}")
+
+            if size >= self.parallel_threshold:
+                transfer_manager.upload_chunks_concurrently(
+                    local_path, blob, chunk_size=self.chunk_size,
+                    worker_type=transfer_manager.THREAD, max_workers=self.max_workers)
+            else:
+                blob.upload_from_filename(local_path)
+
+            logging.info(f"Successfully uploaded {name} to gs://{bucket}/")
 
         except Exception as e:
             logging.error(f"Exception occurred during sync: {str(e)}")
             raise
 
-    def sync_folder_from_gcloud(self, gcp_bucket_url, filename, destination):
-        # Ensure the destination ends with a trailing slash
-        if not destination.endswith("/"):
-            destination += "/"
-
-        command = f'gsutil cp gs://{gcp_bucket_url}/{filename} "{destination}"'
-        logging.info(f"Executing command: {command}")
-        
-        # Use subprocess to run the command and capture output
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            logging.info(f"Successfully copied {filename} to {destination}")
-        else:
-            logging.error(f"Failed to copy {filename}: {result.stderr}")
-            raise Exception(f"gsutil cp failed: {result.stderr}")
\ No newline at end of file
+    def get(self, bucket: str, name: str, destination: str) -> str:
+        from google.cloud.storage import transfer_manager
+
+        try:
+            blob = self._get_blob(bucket, name)
+
+            os.makedirs(destination, exist_ok=True)
+            local_path = os.path.join(destination, os.path.basename(name))
+
+            def download(path):
+                logging.info(f"Downloading gs://{bucket}/{name} ({blob.size} bytes)")
+                if blob.size >= self.parallel_threshold:
+                    transfer_manager.download_chunks_concurrently(
+                        blob, path, chunk_size=self.chunk_size,
+                        worker_type=transfer_manager.THREAD, max_workers=self.max_workers)
+                else:
+                    blob.download_to_filename(path)
+
+            if self.cache is not None:
+                self.cache.fetch(blob_cache_key(blob), local_path, download)
+            else:
+                # Download next to the target and rename, readers never see a partial file
+                tmp_path = f"{local_path}.{os.getpid()}.{threading.get_ident()}.part"
+                try:
+                    download(tmp_path)
+                    os.replace(tmp_path, local_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+
+            logging.info(f"Successfully copied {name} to {destination}")
+            return local_path
+
+        except Exception as e:
+            logging.error(f"Failed to copy {name}: {str(e)}")
+            raise
+
+    def exists(self, bucket: str, name: str) -> bool:
+        return self.client.bucket(bucket).blob(name).exists()
+
+    def delete(self, bucket: str, name: str) -> None:
+        blob = self.client.bucket(bucket).blob(name)
+        if blob.exists():
+            blob.delete()
+
+    def open(self, bucket: str, name: str):
+        # Seeks turn into ranged reads, so zip members can be read without the whole object
+        return self._get_blob(bucket, name).open("rb", chunk_size=self.chunk_size)
+
+    def stat(self, bucket: str, name: str) -> dict:
+        blob = self._get_blob(bucket, name)
+        version = blob.generation or blob.etag or blob.md5_hash
+        return {"size": blob.size, "version": str(version) if version is not None else None,
+                "md5": base64.b64decode(blob.md5_hash).hex() if blob.md5_hash else None}
@@ -0,0 +1,131 @@
+import os
+import shutil
+import logging
+import threading
+from abc import ABC, abstractmethod
+from hate.constants import *
+from hate.utils.fingerprint import file_digest
+
+STORAGE_BACKENDS = ("gcs", "local")
+
+
+class Storage(ABC):
+    """
+    Object store the pipeline reads datasets and models from and pushes models to.
+
+    Backends implement `get`, `put`, `exists`, `delete`, `stat` and `open`; the `sync_*` methods keep
+    the GCloudSync call signatures working on top of them.
+    """
+
+    @abstractmethod
+    def get(self, bucket: str, name: str, destination: str) -> str:
+        """Copy object `name` into the directory `destination` and return the local path."""
+
+    @abstractmethod
+    def put(self, bucket: str, local_path: str, name: str = None) -> None:
+        """Store `local_path` as object `name` (its file name by default)."""
+
+    @abstractmethod
+    def exists(self, bucket: str, name: str) -> bool:
+        """Whether object `name` is in the bucket."""
+
+    @abstractmethod
+    def delete(self, bucket: str, name: str) -> None:
+        """Remove an object, doing nothing when it does not exist."""
+
+    @abstractmethod
+    def stat(self, bucket: str, name: str) -> dict:
+        """Return `size`, `version` and `md5` of an object, FileNotFoundError when missing."""
+
+    @abstractmethod
+    def open(self, bucket: str, name: str):
+        """Open an object for seekable binary reads without copying it to local disk."""
+
+    def sync_folder_to_gcloud(self, gcp_bucket_url, filepath, filename):
+        self.put(gcp_bucket_url, os.path.join(filepath, filename), filename)
+
+    def sync_folder_from_gcloud(self, gcp_bucket_url, filename, destination):
+        self.get(gcp_bucket_url, filename, destination)
+
+    def get_object_version(self, gcp_bucket_url, filename):
+        return self.stat(gcp_bucket_url, filename)["version"]
+
+
+class LocalStorage(Storage):
+    """
+    Storage backed by a local directory, `<root>/<bucket>/<name>`.
+
+    Lets the train and predict pipelines run offline at local disk speed; seed it
+    by copying dataset.zip into `<root>/<BUCKET_NAME>/`.
+    """
+
+    def __init__(self, root: str = LOCAL_STORAGE_DIR):
+        self.root = root
+
+    def _object_path(self, bucket: str, name: str) -> str:
+        return os.path.join(self.root, bucket, name)
+
+    @staticmethod
+    def _copy(source: str, target: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        # Copy next to the target and rename, readers never see a partial file
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, bucket: str, name: str, destination: str) -> str:
+        object_path = self._object_path(bucket, name)
+        if not os.path.isfile(object_path):
+            raise FileNotFoundError(f"Object not found: {object_path}")
+        local_path = os.path.join(destination, os.path.basename(name))
+        logging.info(f"Copying {object_path} to {local_path}")
+        self._copy(object_path, local_path)
+        return local_path
+
+    def put(self, bucket: str, local_path: str, name: str = None) -> None:
+        if not os.path.isfile(local_path):
+            raise FileNotFoundError(f"File not found: {local_path}")
+        object_path = self._object_path(bucket, name or os.path.basename(local_path))
+        logging.info(f"Copying {local_path} to {object_path}")
+        self._copy(local_path, object_path)
+
+    def exists(self, bucket: str, name: str) -> bool:
+        return os.path.isfile(self._object_path(bucket, name))
+
+    def delete(self, bucket: str, name: str) -> None:
+        object_path = self._object_path(bucket, name)
+        if os.path.isfile(object_path):
+            os.remove(object_path)
+
+    def open(self, bucket: str, name: str):
+        return open(self._object_path(bucket, name), "rb")
+
+    def stat(self, bucket: str, name: str) -> dict:
+        object_path = self._object_path(bucket, name)
+        if not os.path.isfile(object_path):
+            raise FileNotFoundError(f"Object not found: {object_path}")
+        stat = os.stat(object_path)
+        return {"size": stat.st_size, "version": f"{stat.st_mtime_ns}-{stat.st_size}",
+                "md5": file_digest(object_path, "md5")}
+
+    def get_object_version(self, gcp_bucket_url, filename):
+        # Polled by the model registry, skip hashing the model file
+        object_path = self._object_path(gcp_bucket_url, filename)
+        if not os.path.isfile(object_path):
+            raise FileNotFoundError(f"Object not found: {object_path}")
+        stat = os.stat(object_path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def get_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    """Return the storage backend named by `backend`: 'gcs' or 'local'."""
+    if backend == "gcs":
+        from hate.configuration.gcloud_syncer import GCloudSync
+        return GCloudSync()
+    if backend == "local":
+        return LocalStorage()
+    raise ValueError(f"Unsupported storage backend '{backend}', expected one of {STORAGE_BACKENDS}")
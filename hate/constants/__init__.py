@@ -9,14 +9,51 @@ BUCKET_NAME = 'hate-speech-nov-2024'
 ZIP_FILE_NAME = 'dataset.zip'
 LABEL = 'label'
 TWEET = 'tweet'
+ARTIFACT_FORMAT = os.environ.get("ARTIFACT_FORMAT", "csv")  # format of the data artifacts passed between stages: csv, parquet or feather
+
+
+# Logging constants
+LOG_DIR = "logs"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # json records, or text for the classic one-line format
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get("REQUEST_LOG_SAMPLE_RATE", "0.01"))  # share of per-request info logs kept
+
+
+# Cloud storage constants
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "gcs")  # gcs, or local to run offline from LOCAL_STORAGE_DIR
+LOCAL_STORAGE_DIR = os.environ.get("LOCAL_STORAGE_DIR", "local_storage")
+GCS_CONNECTION_POOL_SIZE = 16
+GCS_TRANSFER_WORKERS = 8  # threads per chunked upload/download
+GCS_TRANSFER_CHUNK_SIZE = 32 * 1024 * 1024
+GCS_PARALLEL_THRESHOLD = 64 * 1024 * 1024  # smaller objects are transferred in a single request
+GCS_EMULATOR_PROJECT = 'test-project'  # used when STORAGE_EMULATOR_HOST points at a fake GCS server
+DOWNLOAD_CACHE_ENABLED = True
+DOWNLOAD_CACHE_DIR = "download_cache"  # kept outside artifacts/, blobs are shared by every run
+DOWNLOAD_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+
+# Training job constants
+TRAINING_STAGES = ["data_ingestion", "data_transformation", "model_trainer", "model_evaluation", "model_pusher"]
+TRAINING_JOBS_DIR = "training_jobs"
+TRAINING_LOCK_FILE_PATH = "artifacts.lock"  # one training run at a time per artifacts root
+TRAINING_RESUME = False  # reuse finished stages of earlier runs whose fingerprints match
+RUN_REPORT_FILE_NAME = 'run_report.json'  # per-stage timings, CPU, RSS and rows/s, written next to the artifacts
 
 
 # Data ingestion constants
 DATA_INGESTION_ARTIFACTS_DIR = "DataIngestionArtifacts"
 DATA_INGESTION_IMBALANCE_DATA_DIR = "imbalanced_data.csv"
 DATA_INGESTION_RAW_DATA_DIR = "raw_data.csv"
+# extract: unzip the csvs, archive: stream them out of the downloaded zip,
+# remote: stream them out of the zip object in storage without downloading it
+INGESTION_MODE = "extract"
+EXTRACTED_DATA_CACHE_DIR = "extracted_cache"  # unzipped csvs keyed by archive hash, shared by every run
 
 
+# NLTK stopwords are read from here, set NLTK_AUTO_DOWNLOAD=0 where the data is baked into the image
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA", "nltk_data")
+NLTK_AUTO_DOWNLOAD = os.environ.get("NLTK_AUTO_DOWNLOAD", "1") == "1"
+
 # Data transformation constants 
 DATA_TRANSFORMATION_ARTIFACTS_DIR = 'DataTransformationArtifacts'
 TRANSFORMED_FILE_NAME = "final.csv"
@@ -26,6 +63,11 @@ AXIS = 1
 INPLACE = True
 DROP_COLUMNS = ['Unnamed: 0','count','hate_speech','offensive_language','neither']
 CLASS = 'class'
+STEM_CACHE_SIZE = 2 ** 17
+TRANSFORMATION_N_JOBS = -1  # worker processes for text cleaning, -1 uses every core, 1 runs serially
+TRANSFORMATION_CHUNK_SIZE = 20000
+TRANSFORMATION_STREAMING = False  # clean the ingestion csvs chunk by chunk instead of in memory
+TRANSFORMATION_READ_CHUNK_SIZE = 100000
 
 
 # Model training constants
@@ -36,12 +78,28 @@ X_TEST_FILE_NAME = 'x_test.csv'
 Y_TEST_FILE_NAME = 'y_test.csv'
 
 X_TRAIN_FILE_NAME = 'x_train.csv'
+X_TRAIN_SEQUENCES_FILE_NAME = 'x_train_sequences.npy'
+Y_TRAIN_LABELS_FILE_NAME = 'y_train.npy'
+X_TEST_SEQUENCES_FILE_NAME = 'x_test_sequences.npy'
+Y_TEST_LABELS_FILE_NAME = 'y_test.npy'
 
 RANDOM_STATE = 42
 EPOCH = 1
 BATCH_SIZE = 32
 VALIDATION_SPLIT = 0.2
 
+# Inference export: a dropout-free TFLite copy of the trained model served by the predict pipeline
+INFERENCE_MODEL_NAME = 'model.tflite'
+INFERENCE_PARITY_FILE_NAME = 'inference_parity.json'
+EXPORT_INFERENCE_MODEL = True
+INFERENCE_QUANTIZE = False  # int8 weights: 4x smaller, scores differ from keras by ~1e-4
+# One signature per size, fixed at export since the fused TFLite LSTM cannot be resized later;
+# batches run in chunks of the largest and the remainder is padded to the nearest size
+INFERENCE_EXPORT_BATCH_SIZES = (1, 2, 4, 8, 16, 32, 64)
+INFERENCE_PARITY_TOLERANCE = 0.01  # max test accuracy difference before the export is discarded
+INFERENCE_WEIGHTS_NAME = 'model_weights.npz'  # weights for the TensorFlow-free numpy runtime
+EXPORT_NUMPY_WEIGHTS = True
+
 
 # Model Architecture constants
 MAX_WORDS = 15000
@@ -55,8 +113,32 @@ ACTIVATION = 'sigmoid'
 MODEL_EVALUATION_ARTIFACTS_DIR = 'ModelEvaluationArtifacts'
 BEST_MODEL_DIR = "best_Model"
 MODEL_EVALUATION_FILE_NAME = 'loss.csv'
+EVALUATION_BATCH_SIZE = 256  # inference only, larger batches than training are fine
 
 
 MODEL_NAME = 'model.h5'
+
+
+# Prediction constants
+PREDICTION_MODEL_DIR = os.path.join("artifacts", "PredictModel")
+TOKENIZER_FILE_PATH = 'tokenizer.pickle'
+VOCABULARY_FILE_PATH = 'vocabulary.json'
+MODEL_VERSION_CHECK_INTERVAL = 300  # seconds between remote model version checks
+PREDICTION_THRESHOLD = 0.5
+# numpy serves without TensorFlow; tflite is optional and needs tflite-runtime (or falls back to
+# importing tensorflow); keras serves model.h5
+INFERENCE_RUNTIME = os.environ.get("INFERENCE_RUNTIME", "numpy")
+NUMPY_INFERENCE_BATCH_SIZE = 128  # rows per numpy forward pass
+NUMPY_LENGTH_BUCKETING = True  # group rows by token count, short batches skip most padded timesteps
+MAX_BATCH_PREDICTION_TEXTS = 1024
+MICRO_BATCH_MAX_SIZE = max(INFERENCE_EXPORT_BATCH_SIZES)  # one full TFLite invocation per micro batch
+PREDICTION_CACHE_ENABLED = True
+PREDICTION_CACHE_SIZE = 50000  # cached scores, keyed on the encoded tokens of a text
+PREDICTION_CACHE_TTL = 0  # seconds before a cached score expires, 0 keeps it until evicted or the model changes
+MICRO_BATCH_MAX_WAIT_MS = 5
+INFERENCE_WORKERS = 2  # threads running model forward passes, TensorFlow parallelizes each one itself
+MAX_CONCURRENT_PREDICTIONS = 256  # in-flight prediction requests before the app answers 503
+
+
 APP_HOST = "0.0.0.0"
 APP_PORT = 8080
\ No newline at end of file
@@ -5,6 +5,10 @@ from dataclasses import dataclass
 class DataIngestionArtifacts:
     imbalance_data_file_path: str
     raw_data_file_path: str
+    # When set, the two paths above are members of this zip archive; with
+    # archive_bucket set too, archive_path is an object in that storage bucket
+    archive_path: str = None
+    archive_bucket: str = None
 
 
 
@@ -12,6 +16,7 @@ class DataIngestionArtifacts:
 @dataclass
 class DataTransformationArtifacts:
     transformed_data_path: str
+    artifact_format: str = 'csv'
 
 
 
@@ -19,8 +24,13 @@ class DataTransformationArtifacts:
 @dataclass
 class ModelTrainerArtifacts: 
     trained_model_path:str
-    x_test_path: list
-    y_test_path: list
+    x_test_path: str
+    y_test_path: str
+    artifact_format: str = 'csv'
+    x_test_sequences_path: str = None
+    y_test_labels_path: str = None
+    inference_model_path: str = None
+    inference_weights_path: str = None
 
 
 
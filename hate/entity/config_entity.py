@@ -1,25 +1,30 @@
 from dataclasses import dataclass
 from hate.constants import *
+from hate.utils.artifact_io import artifact_file_name, check_artifact_format
 import os
 
 @dataclass
 class DataIngestionConfig:
     def __init__(self):
         self.BUCKET_NAME = BUCKET_NAME
+        self.STORAGE_BACKEND = STORAGE_BACKEND
         self.ZIP_FILE_NAME = ZIP_FILE_NAME
         self.DATA_INGESTION_ARTIFACTS_DIR: str = os.path.join(os.getcwd(),ARTIFACTS_DIR,DATA_INGESTION_ARTIFACTS_DIR)
         self.DATA_ARTIFACTS_DIR: str = os.path.join(self.DATA_INGESTION_ARTIFACTS_DIR,DATA_INGESTION_IMBALANCE_DATA_DIR)
         self.NEW_DATA_ARTIFACTS_DIR: str = os.path.join(self.DATA_INGESTION_ARTIFACTS_DIR,DATA_INGESTION_RAW_DATA_DIR)
         self.ZIP_FILE_DIR = os.path.join(self.DATA_INGESTION_ARTIFACTS_DIR)
         self.ZIP_FILE_PATH = os.path.join(self.DATA_INGESTION_ARTIFACTS_DIR,self.ZIP_FILE_NAME)
+        self.INGESTION_MODE = INGESTION_MODE
+        self.EXTRACTED_DATA_CACHE_DIR = EXTRACTED_DATA_CACHE_DIR
 
 
 
 @dataclass
 class DataTransformationConfig:
     def __init__(self):
+        self.ARTIFACT_FORMAT = check_artifact_format(ARTIFACT_FORMAT)
         self.DATA_TRANSFORMATION_ARTIFACTS_DIR: str = os.path.join(os.getcwd(),ARTIFACTS_DIR,DATA_TRANSFORMATION_ARTIFACTS_DIR)
-        self.TRANSFORMED_FILE_PATH = os.path.join(self.DATA_TRANSFORMATION_ARTIFACTS_DIR,TRANSFORMED_FILE_NAME)
+        self.TRANSFORMED_FILE_PATH = os.path.join(self.DATA_TRANSFORMATION_ARTIFACTS_DIR,artifact_file_name(TRANSFORMED_FILE_NAME, self.ARTIFACT_FORMAT))
         self.ID = ID
         self.AXIS = AXIS
         self.INPLACE = INPLACE 
@@ -27,17 +32,35 @@ class DataTransformationConfig:
         self.CLASS = CLASS 
         self.LABEL = LABEL
         self.TWEET = TWEET
+        self.N_JOBS = TRANSFORMATION_N_JOBS
+        self.CHUNK_SIZE = TRANSFORMATION_CHUNK_SIZE
+        self.STREAMING = TRANSFORMATION_STREAMING
+        self.READ_CHUNK_SIZE = TRANSFORMATION_READ_CHUNK_SIZE
+        self.STORAGE_BACKEND = STORAGE_BACKEND
 
 
 
 @dataclass
 class ModelTrainerConfig: 
     def __init__(self):
+        self.ARTIFACT_FORMAT = check_artifact_format(ARTIFACT_FORMAT)
         self.TRAINED_MODEL_DIR: str = os.path.join(os.getcwd(),ARTIFACTS_DIR,MODEL_TRAINER_ARTIFACTS_DIR) 
         self.TRAINED_MODEL_PATH = os.path.join(self.TRAINED_MODEL_DIR,TRAINED_MODEL_NAME)
-        self.X_TEST_DATA_PATH = os.path.join(self.TRAINED_MODEL_DIR, X_TEST_FILE_NAME)
-        self.Y_TEST_DATA_PATH = os.path.join(self.TRAINED_MODEL_DIR, Y_TEST_FILE_NAME)
-        self.X_TRAIN_DATA_PATH = os.path.join(self.TRAINED_MODEL_DIR, X_TRAIN_FILE_NAME)
+        self.INFERENCE_MODEL_PATH = os.path.join(self.TRAINED_MODEL_DIR, INFERENCE_MODEL_NAME)
+        self.INFERENCE_WEIGHTS_PATH = os.path.join(self.TRAINED_MODEL_DIR, INFERENCE_WEIGHTS_NAME)
+        self.INFERENCE_PARITY_PATH = os.path.join(self.TRAINED_MODEL_DIR, INFERENCE_PARITY_FILE_NAME)
+        self.EXPORT_INFERENCE_MODEL = EXPORT_INFERENCE_MODEL
+        self.EXPORT_NUMPY_WEIGHTS = EXPORT_NUMPY_WEIGHTS
+        self.INFERENCE_QUANTIZE = INFERENCE_QUANTIZE
+        self.INFERENCE_EXPORT_BATCH_SIZES = INFERENCE_EXPORT_BATCH_SIZES
+        self.INFERENCE_PARITY_TOLERANCE = INFERENCE_PARITY_TOLERANCE
+        self.X_TEST_DATA_PATH = os.path.join(self.TRAINED_MODEL_DIR, artifact_file_name(X_TEST_FILE_NAME, self.ARTIFACT_FORMAT))
+        self.Y_TEST_DATA_PATH = os.path.join(self.TRAINED_MODEL_DIR, artifact_file_name(Y_TEST_FILE_NAME, self.ARTIFACT_FORMAT))
+        self.X_TRAIN_DATA_PATH = os.path.join(self.TRAINED_MODEL_DIR, artifact_file_name(X_TRAIN_FILE_NAME, self.ARTIFACT_FORMAT))
+        self.X_TRAIN_SEQUENCES_PATH = os.path.join(self.TRAINED_MODEL_DIR, X_TRAIN_SEQUENCES_FILE_NAME)
+        self.Y_TRAIN_LABELS_PATH = os.path.join(self.TRAINED_MODEL_DIR, Y_TRAIN_LABELS_FILE_NAME)
+        self.X_TEST_SEQUENCES_PATH = os.path.join(self.TRAINED_MODEL_DIR, X_TEST_SEQUENCES_FILE_NAME)
+        self.Y_TEST_LABELS_PATH = os.path.join(self.TRAINED_MODEL_DIR, Y_TEST_LABELS_FILE_NAME)
         self.MAX_WORDS = MAX_WORDS
         self.MAX_LEN = MAX_LEN
         self.LOSS = LOSS
@@ -58,7 +81,9 @@ class ModelEvaluationConfig:
         self.MODEL_EVALUATION_MODEL_DIR: str = os.path.join(os.getcwd(),ARTIFACTS_DIR, MODEL_EVALUATION_ARTIFACTS_DIR)
         self.BEST_MODEL_DIR_PATH: str = os.path.join(self.MODEL_EVALUATION_MODEL_DIR,BEST_MODEL_DIR)
         self.BUCKET_NAME = BUCKET_NAME 
+        self.STORAGE_BACKEND = STORAGE_BACKEND
         self.MODEL_NAME = MODEL_NAME 
+        self.BATCH_SIZE = EVALUATION_BATCH_SIZE
 
 
 
@@ -68,7 +93,10 @@ class ModelPusherConfig:
     def __init__(self):
         self.TRAINED_MODEL_PATH = os.path.join(os.getcwd(),ARTIFACTS_DIR, MODEL_TRAINER_ARTIFACTS_DIR)
         self.BUCKET_NAME = BUCKET_NAME
+        self.STORAGE_BACKEND = STORAGE_BACKEND
         self.MODEL_NAME = MODEL_NAME
+        self.INFERENCE_MODEL_NAME = INFERENCE_MODEL_NAME
+        self.INFERENCE_WEIGHTS_NAME = INFERENCE_WEIGHTS_NAME
     
 
 
@@ -1,18 +1,137 @@
 import logging
+import logging.handlers
 import os
+import json
+import queue
+import atexit
+import random
+import threading
+import multiprocessing.util
 
-from from_root import from_root
-from datetime import datetime
+from datetime import datetime, timezone
+from hate.constants import LOG_DIR, LOG_LEVEL, LOG_FORMAT, REQUEST_LOG_SAMPLE_RATE
 
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path = os.path.join(os.getcwd(), "logs", LOG_FILE)
+logs_path = os.path.join(os.getcwd(), LOG_DIR)
 
 os.makedirs(logs_path, exist_ok=True)
 
 LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[%(asctime)s] [%(filename)s:%(lineno)d] %(levelname)s - %(message)s",
-    level=logging.DEBUG,
-)
+TEXT_FORMAT = "[%(asctime)s] [%(filename)s:%(lineno)d] %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has, anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra=` fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": f"{record.filename}:{record.lineno}",
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without formatting them.
+
+    The stock QueueHandler copies and formats every record on the calling
+    thread; here the message is only merged with its arguments, so mutable
+    arguments cannot change before the listener writes it, and exceptions are
+    formatted by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # SimpleQueue.put is thread safe, skip the handler lock
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+
+class SampledLogger(logging.Logger):
+    """
+    Logger passing every warning and error but only a `sample_rate` share of
+    lower level calls. Sampling happens in `isEnabledFor`, so a dropped call
+    never builds a LogRecord.
+    """
+
+    sample_rate = 1.0
+
+    def isEnabledFor(self, level: int) -> bool:
+        if not super().isEnabledFor(level):
+            return False
+        return level >= logging.WARNING or random.random() < self.sample_rate
+
+
+def _file_handler() -> logging.Handler:
+    handler = logging.FileHandler(LOG_FILE_PATH)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+# Log calls only enqueue the record, a background thread does the formatting and file I/O
+log_queue = queue.SimpleQueue()
+listener = logging.handlers.QueueListener(log_queue, _file_handler(), respect_handler_level=True)
+listener.start()
+_listener_lock = threading.Lock()
+
+
+def stop_listener() -> None:
+    """Write out every queued record and stop the listener thread."""
+    with _listener_lock:
+        if listener._thread is not None:
+            listener.stop()
+
+
+# multiprocessing workers skip atexit handlers but run its finalizers, flush last in both
+atexit.register(stop_listener)
+multiprocessing.util.Finalize(None, stop_listener, exitpriority=-100)
+
+# No record is formatted with processName, skip looking it up on every call
+logging.logMultiprocessing = False
+# Not basicConfig, which does nothing when something (e.g. pytest) already added a root handler
+root_logger = logging.getLogger()
+root_logger.addHandler(DeferredQueueHandler(log_queue))
+root_logger.setLevel(LOG_LEVEL)
+
+_logger_class_lock = threading.Lock()
+
+
+def get_sampled_logger(name: str, sample_rate: float = REQUEST_LOG_SAMPLE_RATE) -> SampledLogger:
+    """Return the `name` logger as a SampledLogger; created on first use, like logging.getLogger."""
+    manager = logging.Logger.manager
+    with _logger_class_lock:
+        previous, manager.loggerClass = manager.loggerClass, SampledLogger
+        try:
+            logger = logging.getLogger(name)
+        finally:
+            manager.loggerClass = previous
+    if not isinstance(logger, SampledLogger):
+        raise ValueError(f"Logger {name} already exists and is not sampled")
+    logger.sample_rate = sample_rate
+    return logger
+
+
+# Per-request logs of the serving path: sampled, and formatted lazily from %-style arguments
+request_logger = get_sampled_logger("hate.request")
@@ -0,0 +1,143 @@
+import threading
+import numpy as np
+from hate.constants import *
+
+DROPOUT_LAYERS = ("SpatialDropout1D", "Dropout")
+
+
+def build_inference_model(model):
+    """
+    Copy a trained Sequential model without its dropout: dropout layers are left
+    out and recurrent layers get dropout=recurrent_dropout=0. Weights are shared
+    unchanged, since dropout layers hold none.
+    """
+    import keras
+
+    config = model.get_config()
+    layers = []
+    for layer in config["layers"]:
+        if layer["class_name"] in DROPOUT_LAYERS:
+            continue
+        # Bidirectional wraps the recurrent layer's config
+        layer_config = layer["config"].get("layer", {}).get("config", layer["config"])
+        for key in ("dropout", "recurrent_dropout"):
+            if key in layer_config:
+                layer_config[key] = 0.0
+        layers.append(layer)
+    config["layers"] = layers
+
+    inference_model = keras.Sequential.from_config(config)
+    inference_model.set_weights(model.get_weights())
+    return inference_model
+
+
+def export_tflite(model, path: str, max_len: int = MAX_LEN, batch_sizes=INFERENCE_EXPORT_BATCH_SIZES,
+                  quantize: bool = INFERENCE_QUANTIZE) -> str:
+    """
+    Write `model` as a TFLite flatbuffer with one signature per batch size, each
+    taking a fixed [batch_size, max_len] int32 input. The signatures share the weights.
+    """
+    import tensorflow as tf
+
+    inference_model = build_inference_model(model)
+    functions = []
+    for batch_size in sorted(set(batch_sizes)):
+        def serve(sequences):
+            return {"scores": inference_model(sequences, training=False)}
+        # The converter keys each signature by its function name
+        serve.__name__ = f"batch_{batch_size}"
+        # A static shape lets the converter fuse each LSTM direction into one TFLite sequence LSTM op
+        signature = tf.TensorSpec([batch_size, max_len], tf.int32, name="sequences")
+        functions.append(tf.function(serve, input_signature=[signature]).get_concrete_function())
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(functions, inference_model)
+    if quantize:
+        # Dynamic range quantization: int8 weights, float activations
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+def _interpreter_class():
+    try:
+        # The standalone runtime avoids importing TensorFlow when it is installed
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    Serves an exported .tflite classifier with the `predict_on_batch` call of a
+    Keras model. Interpreters are not thread safe, each thread gets its own.
+
+    Rows run in chunks of the largest exported batch size, and the remaining
+    rows are padded up to the smallest size that holds them, so a batch of N
+    takes ceil(N / largest size) invocations.
+    """
+
+    def __init__(self, model_path: str):
+        with open(model_path, "rb") as f:
+            self.model_content = f.read()
+        self._local = threading.local()
+        # Fail on load rather than on the first request
+        self.batch_sizes = sorted(self._runners())
+
+    def _runners(self) -> dict:
+        """{batch size: signature runner} of this thread's interpreter."""
+        runners = getattr(self._local, "runners", None)
+        if runners is None:
+            interpreter = _interpreter_class()(model_content=self.model_content)
+            runners = {}
+            for key in interpreter.get_signature_list():
+                runner = interpreter.get_signature_runner(key)
+                (input_details,) = runner.get_input_details().values()
+                runners[int(input_details["shape"][0])] = runner
+            self._local.runners = runners
+        return runners
+
+    def _invoke(self, batch_size: int, chunk: np.ndarray) -> np.ndarray:
+        (scores,) = self._runners()[batch_size](sequences=chunk).values()
+        return scores
+
+    def predict_on_batch(self, sequences) -> np.ndarray:
+        sequences = np.asarray(sequences, dtype=np.int32)
+        largest = self.batch_sizes[-1]
+        scores = None
+        for start in range(0, len(sequences), largest):
+            chunk = sequences[start:start + largest]
+            rows = len(chunk)
+            batch_size = next(size for size in self.batch_sizes if size >= rows)
+            if rows < batch_size:
+                # Pad up to the nearest exported input shape
+                chunk = np.concatenate([chunk, np.zeros((batch_size - rows, chunk.shape[1]), dtype=chunk.dtype)])
+            chunk_scores = self._invoke(batch_size, chunk)
+            if scores is None:
+                scores = np.empty((len(sequences), chunk_scores.shape[1]), dtype=np.float32)
+            scores[start:start + rows] = chunk_scores[:rows]
+        return scores if scores is not None else np.empty((0, 1), dtype=np.float32)
+
+
+def check_parity(keras_model, inference_model, x_test, y_test, tolerance: float = INFERENCE_PARITY_TOLERANCE,
+                 keras_scores: np.ndarray = None) -> dict:
+    """Compare an exported model with the Keras model on the test split, `keras_scores` skips the Keras pass."""
+    if keras_scores is None:
+        keras_scores = keras_model.predict(x_test, batch_size=EVALUATION_BATCH_SIZE, verbose=0)
+    keras_scores = np.asarray(keras_scores)[:, 0]
+    inference_scores = inference_model.predict_on_batch(x_test)[:, 0]
+    labels = np.asarray(y_test).reshape(-1)
+
+    keras_accuracy = float(np.mean((keras_scores > PREDICTION_THRESHOLD) == labels))
+    inference_accuracy = float(np.mean((inference_scores > PREDICTION_THRESHOLD) == labels))
+    return {
+        "keras_accuracy": keras_accuracy,
+        "inference_accuracy": inference_accuracy,
+        "accuracy_delta": inference_accuracy - keras_accuracy,
+        "max_abs_score_diff": float(np.max(np.abs(keras_scores - inference_scores))) if len(labels) else 0.0,
+        "label_agreement": float(np.mean((keras_scores > PREDICTION_THRESHOLD) == (inference_scores > PREDICTION_THRESHOLD)))
+                           if len(labels) else 1.0,
+        "passed": abs(inference_accuracy - keras_accuracy) <= tolerance,
+    }
@@ -1,24 +1,9 @@
 # Creating model architecture.
-from hate.entity.config_entity import ModelTrainerConfig
-from keras.models import Sequential
-from keras.optimizers import RMSprop
-from keras.callbacks import EarlyStopping, ModelCheckpoint
-from keras.layers import LSTM,Activation,Dense,Dropout,Input,Embedding,SpatialDropout1D
 from hate.constants import *
-import pandas as pd
-import re
-import string
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-from sklearn.model_selection import train_test_split
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, LSTM, Dense, SpatialDropout1D
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from tensorflow.keras.layers import Embedding, LSTM, Dense, SpatialDropout1D, Bidirectional
 from tensorflow.keras.callbacks import EarlyStopping
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.regularizers import l2
-from tensorflow.keras.layers import Bidirectional
 
 class ModelArchitecture:
 
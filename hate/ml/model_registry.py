@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import pickle
+import threading
+from hate.logger import logging
+from hate.constants import *
+from hate.exception import CustomException
+from hate.configuration.storage import get_storage
+from hate.ml.sequence_encoder import SequenceEncoder
+from hate.ml.inference_export import TFLiteModel
+from hate.ml.numpy_model import NumpyBiLSTM
+
+
+class ModelRegistry:
+    """
+    Keeps the serving model and sequence encoder resident in memory.
+
+    The model is downloaded and loaded once; afterwards requests are served from
+    memory. The 'tflite' and 'numpy' runtimes serve the exported model.tflite or
+    model_weights.npz when the bucket has one, otherwise the Keras model is loaded.
+    The numpy runtime with a vocabulary.json never imports TensorFlow.
+
+    `reload` (or the periodic version check in `get`) compares the remote object
+    generation with the loaded one and only downloads when it changed.
+    """
+
+    def __init__(self, bucket_name: str = BUCKET_NAME, model_name: str = MODEL_NAME,
+                 model_dir: str = PREDICTION_MODEL_DIR, tokenizer_path: str = TOKENIZER_FILE_PATH,
+                 version_check_interval: float = MODEL_VERSION_CHECK_INTERVAL,
+                 storage_backend: str = STORAGE_BACKEND,
+                 inference_model_name: str = INFERENCE_MODEL_NAME, inference_weights_name: str = INFERENCE_WEIGHTS_NAME,
+                 vocabulary_path: str = VOCABULARY_FILE_PATH, runtime: str = INFERENCE_RUNTIME):
+        self.bucket_name = bucket_name
+        self.model_name = model_name
+        self.runtime = runtime
+        # Serving exports by runtime: (object name, loader)
+        self.inference_models = {"tflite": (inference_model_name, TFLiteModel),
+                                 "numpy": (inference_weights_name, NumpyBiLSTM.load)}
+        self.model_dir = model_dir
+        self.tokenizer_path = tokenizer_path
+        self.vocabulary_path = vocabulary_path
+        self.version_check_interval = version_check_interval
+        self.storage = get_storage(storage_backend)
+
+        self._lock = threading.Lock()
+        # (model, encoder, version) is swapped as one tuple so readers never see a mix
+        self._state = None
+        self._last_version_check = 0.0
+        # Duration of the last model and encoder load, and how many loads there were
+        self.load_seconds = None
+        self.loads = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._state is not None
+
+    @property
+    def version(self):
+        state = self._state
+        return state[2] if state is not None else None
+
+    def _remote_version(self):
+        try:
+            return self.storage.get_object_version(self.bucket_name, self.model_name)
+        except Exception as e:
+            logging.warning(f"[REGISTRY] Could not read remote model version: {e}")
+            return None
+
+    def _load_model(self, version):
+        os.makedirs(self.model_dir, exist_ok=True)
+        if self.runtime in self.inference_models:
+            name, load = self.inference_models[self.runtime]
+            if self.storage.exists(self.bucket_name, name):
+                logging.info(f"[REGISTRY] Downloading {name} (version {version})")
+                model_path = self.storage.get(self.bucket_name, name, self.model_dir)
+                logging.info(f"[REGISTRY] Loading {self.runtime} model from {model_path}")
+                return load(model_path)
+
+        import keras
+
+        logging.info(f"[REGISTRY] Downloading {self.model_name} (version {version})")
+        model_path = self.storage.get(self.bucket_name, self.model_name, self.model_dir)
+        logging.info(f"[REGISTRY] Loading model from {model_path}")
+        return keras.models.load_model(model_path)
+
+    def _load_encoder(self):
+        if os.path.isfile(self.vocabulary_path):
+            logging.info(f"[REGISTRY] Loading vocabulary from {self.vocabulary_path}")
+            return SequenceEncoder.load(self.vocabulary_path)
+        # Unpickling the keras Tokenizer imports TensorFlow
+        logging.info(f"[REGISTRY] Loading tokenizer from {self.tokenizer_path}")
+        with open(self.tokenizer_path, 'rb') as handle:
+            tokenizer = pickle.load(handle)
+        return SequenceEncoder.from_tokenizer(tokenizer)
+
+    def _load(self, version):
+        start = time.perf_counter()
+        model = self._load_model(version)
+        encoder = self._load_encoder()
+
+        self._state = (model, encoder, version)
+        self._last_version_check = time.monotonic()
+        self.load_seconds = time.perf_counter() - start
+        self.loads += 1
+        logging.info(f"[REGISTRY] Model version {version} is now being served, loaded in {self.load_seconds:.2f}s")
+
+    def load(self):
+        """Load the model and encoder if nothing is loaded yet."""
+        try:
+            with self._lock:
+                if self._state is None:
+                    self._load(self._remote_version())
+            return self._state
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the model when the remote version differs from the loaded one.
+
+        Returns True when a new model was loaded.
+        """
+        try:
+            with self._lock:
+                remote_version = self._remote_version()
+                self._last_version_check = time.monotonic()
+                if (not force and self._state is not None
+                        and remote_version is not None and remote_version == self._state[2]):
+                    logging.info(f"[REGISTRY] Model version {remote_version} unchanged, skipping reload")
+                    return False
+                self._load(remote_version)
+                return True
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get(self):
+        """Return the resident (model, encoder, version), loading or refreshing if needed."""
+        state = self._state
+        if state is None:
+            return self.load()
+
+        if (self.version_check_interval
+                and time.monotonic() - self._last_version_check > self.version_check_interval):
+            # Claim the check up front so concurrent requests don't all stat the bucket,
+            # and refresh in the background so this request is served by the resident model
+            self._last_version_check = time.monotonic()
+            threading.Thread(target=self._refresh, name="model-refresh", daemon=True).start()
+        return self._state
+
+    def _refresh(self):
+        try:
+            self.reload()
+        except CustomException as e:
+            # Keep serving the resident model if the refresh fails
+            logging.error(f"[REGISTRY] Model refresh failed: {e}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,158 @@
+import numpy as np
+from hate.constants import *
+
+# Keras LSTM gate order in the kernel columns: input, forget, cell, output
+
+
+def export_numpy_weights(model, path: str) -> str:
+    """
+    Dump the weights of the Embedding -> Bidirectional(LSTM) -> Dense classifier
+    to an .npz file served by `NumpyBiLSTM`. Dropout layers hold no weights and
+    are skipped; anything else the engine cannot reproduce raises ValueError.
+    """
+    weights = {}
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == "Embedding":
+            if layer.mask_zero:
+                raise ValueError("Masked embeddings are not supported")
+            weights["embedding"] = layer.get_weights()[0]
+        elif kind == "Bidirectional":
+            if layer.merge_mode != "concat" or layer.return_sequences:
+                raise ValueError("Only a concatenated final state of the Bidirectional LSTM is supported")
+            for prefix, lstm in (("forward", layer.forward_layer), ("backward", layer.backward_layer)):
+                if (type(lstm).__name__ != "LSTM" or lstm.activation.__name__ != "tanh"
+                        or lstm.recurrent_activation.__name__ != "sigmoid" or not lstm.use_bias):
+                    raise ValueError(f"Unsupported recurrent layer {lstm.name}")
+                kernel, recurrent_kernel, bias = lstm.get_weights()
+                weights[f"{prefix}_kernel"] = kernel
+                weights[f"{prefix}_recurrent_kernel"] = recurrent_kernel
+                weights[f"{prefix}_bias"] = bias
+        elif kind == "Dense":
+            if layer.activation.__name__ != "sigmoid":
+                raise ValueError(f"Unsupported dense activation {layer.activation.__name__}")
+            weights["dense_kernel"], weights["dense_bias"] = layer.get_weights()
+        elif kind not in ("SpatialDropout1D", "Dropout"):
+            raise ValueError(f"Unsupported layer {kind}")
+
+    with open(path, "wb") as f:
+        np.savez(f, **{name: value.astype(np.float32) for name, value in weights.items()})
+    return path
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # tanh form does not overflow for large negative inputs
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _lstm_step(gates: np.ndarray, carry: np.ndarray, units: int):
+    input_gate = _sigmoid(gates[..., :units])
+    forget_gate = _sigmoid(gates[..., units:2 * units])
+    cell_gate = np.tanh(gates[..., 2 * units:3 * units])
+    output_gate = _sigmoid(gates[..., 3 * units:])
+    carry = forget_gate * carry + input_gate * cell_gate
+    return output_gate * np.tanh(carry), carry
+
+
+def sequence_lengths(sequences: np.ndarray) -> np.ndarray:
+    """Length of each pre-padded row without its leading padding."""
+    nonzero = sequences != 0
+    first = np.where(nonzero.any(axis=1), nonzero.argmax(axis=1), sequences.shape[1])
+    return sequences.shape[1] - first
+
+
+class NumpyBiLSTM:
+    """
+    Batched forward pass of the classifier in NumPy, with `predict_on_batch` like
+    a Keras model and no TensorFlow import.
+
+    Both LSTM directions are stepped together: their input projections for every
+    timestep come from one matmul up front, leaving one (2, batch, units) x
+    (2, units, 4*units) matmul per step.
+
+    With `bucketing`, rows are sorted by length and each batch only steps through
+    its longest row. The model has no masking, so padding still counts: the
+    forward direction starts from the (precomputed) state it reaches after the
+    skipped pad tokens, and the backward direction, which reads the padding last,
+    finishes with cheap pad-only steps. Scores match the unbucketed pass.
+    """
+
+    def __init__(self, weights: dict, batch_size: int = NUMPY_INFERENCE_BATCH_SIZE,
+                 bucketing: bool = NUMPY_LENGTH_BUCKETING):
+        self.embedding = weights["embedding"]
+        self.kernels = np.stack([weights["forward_kernel"], weights["backward_kernel"]])
+        self.recurrent_kernels = np.stack([weights["forward_recurrent_kernel"], weights["backward_recurrent_kernel"]])
+        self.biases = np.stack([weights["forward_bias"], weights["backward_bias"]])[:, None, None, :]
+        self.dense_kernel = weights["dense_kernel"]
+        self.dense_bias = weights["dense_bias"]
+        self.units = self.recurrent_kernels.shape[1]
+        # Bounds the (2, steps, batch, 4*units) projection buffer
+        self.batch_size = batch_size
+        self.bucketing = bucketing
+        # Gates input of a pad token, per direction
+        self.pad_projection = self.embedding[0] @ self.kernels + self.biases[:, 0, 0]
+        self._pad_states = {}
+
+    @classmethod
+    def load(cls, path: str, batch_size: int = NUMPY_INFERENCE_BATCH_SIZE,
+             bucketing: bool = NUMPY_LENGTH_BUCKETING) -> "NumpyBiLSTM":
+        with np.load(path) as weights:
+            return cls(dict(weights), batch_size=batch_size, bucketing=bucketing)
+
+    def pad_states(self, max_len: int):
+        """Forward (state, carry) after 0..max_len pad tokens, shape (max_len + 1, units) each."""
+        if max_len not in self._pad_states:
+            states = np.zeros((max_len + 1, self.units), dtype=np.float32)
+            carries = np.zeros((max_len + 1, self.units), dtype=np.float32)
+            for step in range(max_len):
+                gates = self.pad_projection[0] + states[step] @ self.recurrent_kernels[0]
+                states[step + 1], carries[step + 1] = _lstm_step(gates, carries[step], self.units)
+            self._pad_states[max_len] = (states, carries)
+        return self._pad_states[max_len]
+
+    def _forward(self, sequences: np.ndarray, steps: int) -> np.ndarray:
+        """Score rows whose tokens all lie in the last `steps` columns."""
+        units = self.units
+        batch, max_len = sequences.shape
+        state = np.zeros((2, batch, units), dtype=np.float32)
+        carry = np.zeros((2, batch, units), dtype=np.float32)
+        skipped = max_len - steps
+        if skipped:
+            pad_states, pad_carries = self.pad_states(max_len)
+            state[0], carry[0] = pad_states[skipped], pad_carries[skipped]
+
+        if steps:
+            # (steps, batch, embedding_dim)
+            inputs = self.embedding[sequences[:, skipped:].T]
+            # (2, steps, batch, 4*units), the backward direction reads the sequence reversed
+            projected = np.matmul(inputs[None], self.kernels[:, None]) + self.biases
+            projected[1] = projected[1, ::-1].copy()
+            for step in range(steps):
+                gates = projected[:, step] + np.matmul(state, self.recurrent_kernels)
+                state, carry = _lstm_step(gates, carry, units)
+
+        # The backward direction ends on the skipped padding
+        backward_state, backward_carry = state[1], carry[1]
+        for _ in range(skipped):
+            gates = self.pad_projection[1] + backward_state @ self.recurrent_kernels[1]
+            backward_state, backward_carry = _lstm_step(gates, backward_carry, units)
+
+        merged = np.concatenate([state[0], backward_state], axis=1)
+        return _sigmoid(merged @ self.dense_kernel + self.dense_bias)
+
+    def predict_on_batch(self, sequences) -> np.ndarray:
+        sequences = np.asarray(sequences, dtype=np.int64)
+        scores = np.empty((len(sequences), self.dense_kernel.shape[1]), dtype=np.float32)
+        if not self.bucketing:
+            for start in range(0, len(sequences), self.batch_size):
+                scores[start:start + self.batch_size] = self._forward(sequences[start:start + self.batch_size],
+                                                                      sequences.shape[1])
+            return scores
+
+        lengths = sequence_lengths(sequences)
+        order = np.argsort(lengths, kind="stable")
+        for start in range(0, len(sequences), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            # Scatter back to the input order
+            scores[rows] = self._forward(sequences[rows], int(lengths[rows].max()))
+        return scores
@@ -0,0 +1,62 @@
+import time
+import threading
+from collections import OrderedDict
+from hate.constants import *
+
+
+class PredictionCache:
+    """
+    Bounded LRU of model scores keyed on the encoded token sequence, so repeated
+    texts (retweets, copypasta, spam waves) skip the model forward pass.
+
+    Entries belong to one resident model: `bind` clears the cache as soon as the
+    pipeline is handed a different model object, and keys carry the model version
+    as well. With `ttl` > 0 entries also expire after that many seconds.
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl: float = PREDICTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._model = None
+        self._lock = threading.Lock()
+
+    def bind(self, model) -> None:
+        """Drop every entry when `model` is not the model the entries were computed with."""
+        with self._lock:
+            if model is not self._model:
+                self._entries.clear()
+                self._model = model
+
+    def get(self, key):
+        """Return the cached score for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, score: float) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (score, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
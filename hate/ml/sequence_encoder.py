@@ -0,0 +1,74 @@
+import json
+import numpy as np
+from hate.constants import *
+
+
+class SequenceEncoder:
+    """
+    Replacement for `Tokenizer.texts_to_sequences` + `pad_sequences` on the hot path.
+
+    Holds only the vocabulary the model can see (index < num_words) and writes
+    token ids straight into a preallocated int32 (batch, max_len) buffer with
+    Keras' default pre-padding and pre-truncation, so there is no intermediate
+    list of sequences and no separate padding pass.
+    """
+
+    def __init__(self, word_index: dict, max_len: int = MAX_LEN, filters: str = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n',
+                 lower: bool = True, split: str = ' ', oov_index: int = None):
+        self.word_index = word_index
+        self.max_len = max_len
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.oov_index = oov_index
+        self._translate_map = str.maketrans({c: split for c in filters})
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer, max_len: int = MAX_LEN) -> "SequenceEncoder":
+        """Export the vocabulary of a fitted keras Tokenizer, capped at its num_words."""
+        if tokenizer.char_level or tokenizer.analyzer is not None:
+            raise ValueError("Only word level tokenizers without a custom analyzer are supported")
+        num_words = tokenizer.num_words
+        word_index = {word: index for word, index in tokenizer.word_index.items()
+                      if not num_words or index < num_words}
+        oov_index = tokenizer.word_index.get(tokenizer.oov_token) if tokenizer.oov_token is not None else None
+        return cls(word_index, max_len=max_len, filters=tokenizer.filters, lower=tokenizer.lower,
+                   split=tokenizer.split, oov_index=oov_index)
+
+    def tokens(self, text: str) -> list:
+        if self.lower:
+            text = text.lower()
+        get = self.word_index.get
+        words = text.translate(self._translate_map).split(self.split)
+        if self.oov_index is None:
+            return [index for index in map(get, words) if index is not None]
+        # Keras drops the empty strings produced by repeated separators before the lookup
+        return [get(word, self.oov_index) for word in words if word]
+
+    def encode(self, texts, out: np.ndarray = None) -> np.ndarray:
+        """Encode texts into `out` (allocated when not given) and return it."""
+        max_len = self.max_len
+        if out is None:
+            out = np.zeros((len(texts), max_len), dtype=np.int32)
+        else:
+            out[:] = 0
+        for row, text in enumerate(texts):
+            ids = self.tokens(text)
+            if not ids:
+                continue
+            if len(ids) > max_len:
+                ids = ids[-max_len:]
+            out[row, max_len - len(ids):] = ids
+        return out
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "word_index": self.word_index, "max_len": self.max_len, "filters": self.filters,
+                "lower": self.lower, "split": self.split, "oov_index": self.oov_index,
+            }, f)
+
+    @classmethod
+    def load(cls, file_path: str) -> "SequenceEncoder":
+        with open(file_path, encoding='utf-8') as f:
+            return cls(**json.load(f))
@@ -0,0 +1,90 @@
+import os
+import re
+import string
+import threading
+from functools import lru_cache
+from hate.constants import *
+
+
+def load_stopwords(language: str = 'english') -> frozenset:
+    """
+    Read the NLTK stopword list from NLTK_DATA_DIR (or nltk's default search path).
+    It is only downloaded, into NLTK_DATA_DIR, when missing and NLTK_AUTO_DOWNLOAD is set.
+    """
+    import nltk
+    from nltk.corpus import stopwords
+
+    data_dir = os.path.abspath(NLTK_DATA_DIR)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+    try:
+        return frozenset(stopwords.words(language))
+    except LookupError:
+        if not NLTK_AUTO_DOWNLOAD:
+            raise
+        nltk.download('stopwords', download_dir=data_dir, quiet=True)
+        return frozenset(stopwords.words(language))
+
+
+class TextCleaner:
+    """
+    Stateless tweet cleaner built once and reused for every row and request.
+
+    Produces exactly the same output as the original per-call `clean_text`:
+    lowercase, drop [..] tags, urls, <..> markup, punctuation, newlines and
+    words containing digits, remove stopwords and stem what is left.
+    """
+
+    _BRACKETS = re.compile(r'\[.*?\]')
+    _URLS = re.compile(r'https?://\S+|www\.\S+')
+    _MARKUP = re.compile(r'<.*?>+')
+    _WORDS_WITH_DIGITS = re.compile(r'\w*\d\w*')
+    # Punctuation and newline removal are single character deletions, one translate does both
+    _DELETE_CHARS = str.maketrans('', '', string.punctuation + '\n')
+
+    def __init__(self, language: str = 'english', stem_cache_size: int = STEM_CACHE_SIZE):
+        # nltk (which imports scipy and sklearn) is only loaded when a cleaner is built
+        from nltk.stem.snowball import SnowballStemmer
+
+        self.language = language
+        self.stopwords = load_stopwords(language)
+        self.stem = lru_cache(maxsize=stem_cache_size)(SnowballStemmer(language).stem)
+
+    def clean(self, text) -> str:
+        text = str(text).lower()
+        # The substitutions must run in this order to match the original cleaner,
+        # the membership checks only skip passes that cannot match
+        if '[' in text:
+            text = self._BRACKETS.sub('', text)
+        if 'http' in text or 'www.' in text:
+            text = self._URLS.sub('', text)
+        if '<' in text:
+            text = self._MARKUP.sub('', text)
+        text = text.translate(self._DELETE_CHARS)
+        text = self._WORDS_WITH_DIGITS.sub('', text)
+
+        stopword = self.stopwords
+        stem = self.stem
+        return " ".join([stem(word) for word in text.split(' ') if word not in stopword])
+
+    __call__ = clean
+
+
+_text_cleaner = None
+_text_cleaner_lock = threading.Lock()
+
+
+def get_text_cleaner() -> TextCleaner:
+    """Return the process-wide text cleaner."""
+    global _text_cleaner
+    if _text_cleaner is None:
+        with _text_cleaner_lock:
+            if _text_cleaner is None:
+                _text_cleaner = TextCleaner()
+    return _text_cleaner
+
+
+def clean_texts(texts) -> list:
+    """Clean a chunk of texts, used as the worker function of the parallel transformation."""
+    cleaner = get_text_cleaner()
+    return [cleaner.clean(text) for text in texts]
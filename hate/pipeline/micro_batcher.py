@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List
+from hate.logger import logging
+from hate.constants import *
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single-item requests into one batched call.
+
+    Items submitted while a batch is being collected are flushed together once
+    `max_batch_size` items are waiting or `max_wait_ms` has passed since the
+    first one arrived, whichever comes first. Batches run on `executor` with at
+    most `max_in_flight` of them at once, while the next batch is collected.
+    """
+
+    def __init__(self, batch_fn: Callable[[List], List],
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+                 executor: Executor = None, max_in_flight: int = 1):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self._queue = None
+        self._worker = None
+        self._in_flight = None
+        self._flushes = set()
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, item):
+        """Queue one item and wait for its result from the next flushed batch."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free slot first, items keep queuing meanwhile and form a larger batch
+            await self._in_flight.acquire()
+            batch = await self._collect()
+            flush = loop.create_task(self._flush(batch))
+            # Keep a reference so the task is not garbage collected while running
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            # The model call is blocking, keep it off the event loop
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.batch_fn, items)
+        except Exception as e:
+            logging.error(f"[MICRO BATCH] Batch of {len(items)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight.release()
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -1,85 +1,109 @@
-import os
-import io
 import sys
-import keras
-import pickle
-from PIL import Image
-from hate.logger import logging
+from typing import List
+from hate.logger import request_logger
 from hate.constants import *
 from hate.exception import CustomException
-from keras.utils import pad_sequences
-from hate.configuration.gcloud_syncer import GCloudSync
-from hate.components.data_transforamation import DataTransformation
-from hate.entity.config_entity import DataTransformationConfig
-from hate.entity.artifact_entity import DataIngestionArtifacts
+from hate.ml.model_registry import ModelRegistry, get_model_registry
+from hate.ml.prediction_cache import PredictionCache
+from hate.ml.text_cleaner import get_text_cleaner
+from hate.utils.metrics import Timer, PREDICTION_PHASE_SECONDS, PREDICTION_BATCH_SIZE, PREDICTIONS
 
 
 class PredictionPipeline:
-    def __init__(self):
-        self.bucket_name = BUCKET_NAME
-        self.model_name = MODEL_NAME
-        self.model_path = os.path.join("artifacts", "PredictModel")
-        self.gcloud = GCloudSync()
-        self.data_transformation = DataTransformation(data_transformation_config= DataTransformationConfig,data_ingestion_artifacts=DataIngestionArtifacts)
+    def __init__(self, model_registry: ModelRegistry = None, prediction_cache: PredictionCache = None):
+        self.model_registry = model_registry or get_model_registry()
+        if prediction_cache is None and PREDICTION_CACHE_ENABLED:
+            prediction_cache = PredictionCache()
+        self.prediction_cache = prediction_cache
 
 
-    
-    def get_model_from_gcloud(self) -> str:
+    @staticmethod
+    def _label(score) -> str:
+        return "hate and abusive" if score > PREDICTION_THRESHOLD else "no hate"
+
+
+    def _cached_scores(self, model, padded, version) -> list:
+        """Scores for the encoded rows, running the model only on rows not in the prediction cache."""
+        cache = self.prediction_cache
+        cache.bind(model)
+        # Duplicates within the batch share one lookup and one model row
+        rows_by_key = {}
+        for row, sequence in enumerate(padded):
+            rows_by_key.setdefault((version, sequence.tobytes()), []).append(row)
+
+        scores = [None] * len(padded)
+        misses = []
+        for key, rows in rows_by_key.items():
+            score = cache.get(key)
+            if score is None:
+                misses.append(key)
+            for row in rows:
+                scores[row] = score
+
+        if misses:
+            pred = model.predict_on_batch(padded[[rows_by_key[key][0] for key in misses]])
+            for key, score in zip(misses, pred[:, 0]):
+                score = float(score)
+                cache.put(key, score)
+                for row in rows_by_key[key]:
+                    scores[row] = score
+        return scores
+
+
+    def predict_batch(self, texts: List[str]) -> List[str]:
         """
-        Method Name :   get_model_from_gcloud
-        Description :   This method to get best model from google cloud storage
-        Output      :   best_model_path
+        Method Name :   predict_batch
+        Description :   Clean, tokenize and classify many texts with one model forward pass
+        Output      :   predicted labels, in input order
         """
-        logging.info("Entered the get_model_from_gcloud method of PredictionPipeline class")
+        request_logger.debug("Running the predict_batch function on %d texts", len(texts))
         try:
-            # Loading the best model from s3 bucket
-            os.makedirs(self.model_path, exist_ok=True)
-            self.gcloud.sync_folder_from_gcloud(self.bucket_name, self.model_name, self.model_path)
-            best_model_path = os.path.join(self.model_path, self.model_name)
-            logging.info("Exited the get_model_from_gcloud method of PredictionPipeline class")
-            return best_model_path
+            if not texts:
+                return []
+            load_model, encoder, version = self.model_registry.get()
+
+            timer = Timer(PREDICTION_PHASE_SECONDS)
+            cleaner = get_text_cleaner()
+            cleaned = [cleaner.clean(text) for text in texts]
+            timer.mark("cleaning")
+            padded = encoder.encode(cleaned)
+            timer.mark("tokenization")
+            if self.prediction_cache is None:
+                scores = [score[0] for score in load_model.predict_on_batch(padded)]
+            else:
+                scores = self._cached_scores(load_model, padded, version)
+            timer.mark("forward")
+            labels = [self._label(score) for score in scores]
 
+            timer.observe()
+            PREDICTION_BATCH_SIZE.observe(len(texts))
+            hateful = sum(label != "no hate" for label in labels)
+            PREDICTIONS.inc(hateful, label="hate and abusive")
+            PREDICTIONS.inc(len(labels) - hateful, label="no hate")
+            return labels
         except Exception as e:
             raise CustomException(e, sys) from e
-        
 
-    
-    def predict(self,best_model_path,text):
-        """load image, returns cuda tensor"""
-        logging.info("Running the predict function")
+
+    def predict(self,text):
+        """
+        Method Name :   predict
+        Description :   Clean, tokenize and classify a single text with the resident model
+        Output      :   predicted label
+        """
+        request_logger.debug("Running the predict function")
         try:
-            best_model_path:str = self.get_model_from_gcloud()
-            load_model=keras.models.load_model(best_model_path)
-            with open('tokenizer.pickle', 'rb') as handle:
-                load_tokenizer = pickle.load(handle)
-            
-            text=self.data_transformation.concat_data_cleaning(text)
-            text = [text]            
-            print(text)
-            seq = load_tokenizer.texts_to_sequences(text)
-            padded = pad_sequences(seq, maxlen=MAX_LEN)
-            print(seq)
-            pred = load_model.predict(padded)
-            pred
-            print("pred", pred)
-            if pred>0.5:
-
-                print("hate and abusive")
-                return "hate and abusive"
-            else:
-                print("no hate")
-                return "no hate"
+            return self.predict_batch([text])[0]
         except Exception as e:
             raise CustomException(e, sys) from e
 
-    
+
     def run_pipeline(self,text):
-        logging.info("Entered the run_pipeline method of PredictionPipeline class")
+        request_logger.debug("Entered the run_pipeline method of PredictionPipeline class")
         try:
 
-            best_model_path: str = self.get_model_from_gcloud() 
-            predicted_text = self.predict(best_model_path,text)
-            logging.info("Exited the run_pipeline method of PredictionPipeline class")
+            predicted_text = self.predict(text)
+            request_logger.debug("Exited the run_pipeline method of PredictionPipeline class")
             return predicted_text
         except Exception as e:
-            raise CustomException(e, sys) from e
\ No newline at end of file
+            raise CustomException(e, sys) from e
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+from dataclasses import asdict
+from hate.logger import logging
+from hate.constants import *
+from hate.utils.fingerprint import json_digest, module_digest
+
+RUN_MANIFEST_FILE_NAME = "run_manifest.json"
+
+# Source modules whose code decides each stage's output
+STAGE_MODULES = {
+    "data_ingestion": ["hate.components.data_ingestion"],
+    "data_transformation": ["hate.components.data_transforamation", "hate.ml.text_cleaner",
+                            "hate.utils.artifact_io"],
+    "model_trainer": ["hate.components.model_trainer", "hate.ml.model", "hate.ml.sequence_encoder",
+                      "hate.ml.inference_export", "hate.utils.artifact_io"],
+    "model_evaluation": ["hate.components.model_evaluation", "hate.ml.sequence_encoder"],
+    "model_pusher": ["hate.components.model_pusher"],
+}
+
+
+def _file_signature(path: str):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class StageCache:
+    """
+    Records a fingerprint for every finished TrainPipeline stage in
+    `<artifacts_dir>/run_manifest.json` and looks up earlier runs for a stage with
+    the same fingerprint, so a resumed run can reuse its artifacts.
+
+    A fingerprint hashes the stage's inputs (the upstream fingerprint, or the
+    dataset/incumbent model version), its config and the source of its code.
+    """
+
+    def __init__(self, artifacts_dir: str = ARTIFACTS_DIR):
+        self.artifacts_dir = artifacts_dir
+        self.artifacts_root = os.path.dirname(artifacts_dir)
+        self.manifest_path = os.path.join(artifacts_dir, RUN_MANIFEST_FILE_NAME)
+
+    def _normalize(self, value):
+        # Paths differ per run only by the timestamped directory
+        if isinstance(value, str):
+            return value.replace(os.path.join(os.getcwd(), self.artifacts_dir), "<run>").replace(self.artifacts_dir, "<run>")
+        if isinstance(value, (list, tuple)):
+            return [self._normalize(item) for item in value]
+        return value
+
+    def fingerprint(self, stage: str, config, inputs: list) -> str:
+        return json_digest({
+            "stage": stage,
+            "inputs": inputs,
+            "config": {key: self._normalize(value) for key, value in vars(config).items()},
+            "code": module_digest(STAGE_MODULES[stage]),
+        })
+
+    @staticmethod
+    def _read_manifest(manifest_path: str) -> dict:
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"stages": {}}
+
+    @staticmethod
+    def _outputs_valid(entry: dict) -> bool:
+        for path, signature in entry["outputs"].items():
+            if not os.path.isfile(path) or _file_signature(path) != signature:
+                return False
+        return True
+
+    def lookup(self, stage: str, fingerprint: str, artifact_cls):
+        """Return the artifacts of the newest earlier run of `stage` with this fingerprint, or None."""
+        if not os.path.isdir(self.artifacts_root):
+            return None
+        current = os.path.basename(self.artifacts_dir)
+        for run in sorted(os.listdir(self.artifacts_root), reverse=True):
+            if run == current:
+                continue
+            entry = self._read_manifest(os.path.join(self.artifacts_root, run, RUN_MANIFEST_FILE_NAME))["stages"].get(stage)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                continue
+            if not self._outputs_valid(entry):
+                logging.info(f"[STAGE CACHE] {stage} outputs of run {run} changed or were removed, not reusing them")
+                continue
+            logging.info(f"[STAGE CACHE] Reusing {stage} from run {run} (fingerprint {fingerprint[:12]})")
+            artifacts = artifact_cls(**entry["artifacts"])
+            self.record(stage, fingerprint, artifacts, entry["outputs"].keys(), reused_from=run)
+            return artifacts
+        return None
+
+    def record(self, stage: str, fingerprint: str, artifacts, extra_files=(), reused_from: str = None):
+        """Add a finished stage to this run's manifest."""
+        values = asdict(artifacts)
+        files = [value for value in values.values() if isinstance(value, str) and os.path.isabs(value)]
+        files += list(extra_files)
+        manifest = self._read_manifest(self.manifest_path)
+        manifest["stages"][stage] = {
+            "fingerprint": fingerprint,
+            "artifacts": values,
+            "outputs": {path: _file_signature(path) for path in files if os.path.isfile(path)},
+            "finished_at": time.time(),
+            "reused_from": reused_from,
+        }
+        os.makedirs(self.artifacts_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -1,11 +1,16 @@
+import os
 import sys
 from hate.logger import logging
+from hate.constants import *
 from hate.exception import CustomException
 from hate.components.data_ingestion import DataIngestion
 from hate.components.data_transforamation import DataTransformation
 from hate.components.model_trainer import ModelTrainer
 from hate.components.model_evaluation import ModelEvaluation
 from hate.components.model_pusher import ModelPusher
+from hate.configuration.storage import get_storage
+from hate.pipeline.stage_cache import StageCache
+from hate.utils.instrumentation import start_run_recorder
 
 from hate.entity.config_entity import (DataIngestionConfig,
                                        DataTransformationConfig,
@@ -21,12 +26,31 @@ from hate.entity.artifact_entity import (DataIngestionArtifacts,
 
 
 class TrainPipeline:
-    def __init__(self):
+    STAGES = TRAINING_STAGES
+
+    def __init__(self, progress_callback=None, resume: bool = TRAINING_RESUME):
+        """
+        :param progress_callback: optional callable(stage, status) notified when a stage
+                                  starts ("running"), finishes ("completed" or "reused") or fails ("failed")
+        :param resume: reuse stages of earlier runs whose fingerprints match instead of re-running them
+        """
         self.data_ingestion_config = DataIngestionConfig()
         self.data_transformation_config = DataTransformationConfig()
         self.model_trainer_config = ModelTrainerConfig()
         self.model_evaluation_config =ModelEvaluationConfig()
         self.model_pusher_config = ModelPusherConfig()
+        self.progress_callback = progress_callback
+        self.resume = resume
+        self.stage_cache = StageCache()
+        self.fingerprints = {}
+        self.current_stage = None
+        self.recorder = None
+
+    def _report(self, stage: str, status: str):
+        if status == "running":
+            self.current_stage = stage
+        if self.progress_callback is not None:
+            self.progress_callback(stage, status)
 
 
     
@@ -104,11 +128,12 @@ class TrainPipeline:
         
     
 
-    def start_model_pusher(self,) -> ModelPusherArtifacts:
+    def start_model_pusher(self, model_trainer_artifacts: ModelTrainerArtifacts = None) -> ModelPusherArtifacts:
         logging.info("Entered the start_model_pusher method of TrainPipeline class")
         try:
             model_pusher = ModelPusher(
                 model_pusher_config=self.model_pusher_config,
+                model_trainer_artifacts=model_trainer_artifacts,
             )
             model_pusher_artifact = model_pusher.initiate_model_pusher()
             logging.info("Initiated the model pusher")
@@ -126,31 +151,86 @@ class TrainPipeline:
     
     
     
+    def _object_version(self, config, name: str):
+        storage = get_storage(config.STORAGE_BACKEND)
+        if not storage.exists(config.BUCKET_NAME, name):
+            return None
+        return storage.get_object_version(config.BUCKET_NAME, name)
+
+    def run_stage(self, stage: str, config, inputs: list, artifact_cls, start, *args, extra_files=(), **kwargs):
+        """Run one stage, or reuse an earlier run's artifacts for it when resuming with a matching fingerprint."""
+        self._report(stage, "running")
+        with self.recorder.span(stage) as stage_span:
+            stage_span.attributes["status"] = "failed"
+            fingerprint = self.stage_cache.fingerprint(stage, config, inputs)
+            self.fingerprints[stage] = fingerprint
+
+            artifacts = self.stage_cache.lookup(stage, fingerprint, artifact_cls) if self.resume else None
+            if artifacts is not None:
+                stage_span.attributes["status"] = "reused"
+                self._report(stage, "reused")
+                return artifacts
+
+            artifacts = start(*args, **kwargs)
+            self.stage_cache.record(stage, fingerprint, artifacts, extra_files)
+            stage_span.attributes["status"] = "completed"
+        logging.info(f"[{stage}] completed in {stage_span.wall_s:.2f}s (cpu {stage_span.cpu_s:.2f}s, "
+                     f"peak rss {stage_span.peak_rss_mb} MB)")
+        self._report(stage, "completed")
+        return artifacts
+
+    def write_run_report(self, status: str) -> None:
+        """Save the per-stage timings of this run as JSON next to its artifacts."""
+        try:
+            path = os.path.join(self.stage_cache.artifacts_dir, RUN_REPORT_FILE_NAME)
+            self.recorder.write(path, run=os.path.basename(self.stage_cache.artifacts_dir), status=status,
+                                resume=self.resume, fingerprints=self.fingerprints)
+            logging.info(f"Run report written to {path}")
+        except Exception as e:
+            # A missing report must not fail the training run
+            logging.error(f"Could not write the run report: {e}")
+
     def run_pipeline(self):
         logging.info("Entered the run_pipeline method of TrainPipeline class")
+        self.recorder = start_run_recorder()
+        status = "failed"
         try:
             # Data ingestion
             logging.info("[STEP 1] Starting data ingestion")
-            data_ingestion_artifacts = self.start_data_ingestion()
+            data_ingestion_artifacts = self.run_stage(
+                "data_ingestion", self.data_ingestion_config,
+                [self._object_version(self.data_ingestion_config, self.data_ingestion_config.ZIP_FILE_NAME)],
+                DataIngestionArtifacts, self.start_data_ingestion
+            )
             logging.info("[STEP 1 COMPLETED] Data ingestion completed")
 
             # Data transformation
             logging.info("[STEP 2] Starting data transformation")
-            data_transformation_artifacts = self.start_data_transformation(
+            data_transformation_artifacts = self.run_stage(
+                "data_transformation", self.data_transformation_config, [self.fingerprints["data_ingestion"]],
+                DataTransformationArtifacts, self.start_data_transformation,
                 data_ingestion_artifacts=data_ingestion_artifacts
             )
             logging.info("[STEP 2 COMPLETED] Data transformation completed")
 
             # Model training
             logging.info("[STEP 3] Starting model training")
-            model_trainer_artifacts = self.start_model_trainer(
-                data_transformation_artifacts=data_transformation_artifacts
+            model_trainer_artifacts = self.run_stage(
+                "model_trainer", self.model_trainer_config, [self.fingerprints["data_transformation"]],
+                ModelTrainerArtifacts, self.start_model_trainer,
+                data_transformation_artifacts=data_transformation_artifacts,
+                # The tokenizer is written outside the artifacts directory
+                extra_files=[TOKENIZER_FILE_PATH, VOCABULARY_FILE_PATH]
             )
             logging.info("[STEP 3 COMPLETED] Model training completed")
 
             # Model evaluation
             logging.info("[STEP 4] Starting model evaluation")
-            model_evaluation_artifacts = self.start_model_evaluation(
+            model_evaluation_artifacts = self.run_stage(
+                "model_evaluation", self.model_evaluation_config,
+                [self.fingerprints["model_trainer"],
+                 self._object_version(self.model_evaluation_config, self.model_evaluation_config.MODEL_NAME)],
+                ModelEvaluationArtifacts, self.start_model_evaluation,
                 model_trainer_artifacts=model_trainer_artifacts,
                 data_transformation_artifacts=data_transformation_artifacts,
             )
@@ -162,10 +242,19 @@ class TrainPipeline:
 
             # Model pusher
             logging.info("[STEP 5] Starting model pushing")
-            model_pusher_artifacts = self.start_model_pusher()
+            model_pusher_artifacts = self.run_stage(
+                "model_pusher", self.model_pusher_config, [self.fingerprints["model_evaluation"]],
+                ModelPusherArtifacts, self.start_model_pusher,
+                model_trainer_artifacts=model_trainer_artifacts
+            )
             logging.info("[STEP 5 COMPLETED] Model pushing completed")
 
             logging.info("Pipeline execution completed successfully")
+            status = "succeeded"
         except Exception as e:
             logging.error("Pipeline execution failed")
+            if self.current_stage is not None:
+                self._report(self.current_stage, "failed")
             raise CustomException(e, sys) from e
+        finally:
+            self.write_run_report(status)
@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import threading
+import multiprocessing
+from collections import deque
+from hate.logger import logging
+from hate.constants import *
+from hate.exception import CustomException
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _write_status(status_path: str, status: dict) -> None:
+    # Write then rename so readers never see a half written file
+    tmp_path = f"{status_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_path, status_path)
+
+
+def _read_status(status_path: str) -> dict:
+    with open(status_path) as f:
+        return json.load(f)
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows, assume the holder is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _terminate_job_process(process) -> None:
+    """Terminate a worker together with the processes it started, e.g. its cleaning pool."""
+    if hasattr(os, "killpg"):
+        try:
+            # Workers lead their own process group, which their children inherit
+            os.killpg(process.pid, signal.SIGTERM)
+            return
+        except (ProcessLookupError, PermissionError):
+            # Not a group leader yet
+            pass
+    process.terminate()
+
+
+def acquire_training_lock(lock_path: str) -> bool:
+    """Create the lock file for an artifacts root, replacing it if its holder died."""
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(lock_path) as f:
+                    holder = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                holder = 0
+            if holder and _pid_alive(holder):
+                return False
+            logging.warning(f"[TRAINING JOB] Removing stale training lock {lock_path} held by {holder}")
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def release_training_lock(lock_path: str) -> None:
+    try:
+        os.remove(lock_path)
+    except FileNotFoundError:
+        pass
+
+
+def run_training_job(job_id: str, status_path: str, lock_path: str, resume: bool = False,
+                     pipeline_class=None) -> None:
+    """Entry point of the worker process: run the TrainPipeline and record per-stage progress."""
+    if hasattr(os, "setpgrp"):
+        # Own process group, so cancelling the job also stops the processes it starts
+        os.setpgrp()
+    if pipeline_class is None:
+        # Imported here so only the worker process pays for loading the training stack
+        from hate.pipeline.train_pipeline import TrainPipeline as pipeline_class
+
+    status = _read_status(status_path)
+    if not acquire_training_lock(lock_path):
+        status.update(status=FAILED, finished_at=time.time(),
+                      error="Another training run holds the lock for this artifacts root")
+        _write_status(status_path, status)
+        return
+
+    def on_progress(stage: str, stage_status: str):
+        now = time.time()
+        entry = status["stages"][stage]
+        entry["status"] = stage_status
+        if stage_status == "running":
+            entry["started_at"] = now
+            status["current_stage"] = stage
+        else:
+            entry["finished_at"] = now
+            entry["duration_seconds"] = round(now - entry["started_at"], 3)
+        _write_status(status_path, status)
+
+    try:
+        status.update(status=RUNNING, started_at=time.time(), pid=os.getpid(), artifacts_dir=ARTIFACTS_DIR)
+        _write_status(status_path, status)
+
+        pipeline_class(progress_callback=on_progress, resume=resume).run_pipeline()
+
+        status.update(status=SUCCEEDED, current_stage=None)
+    except Exception as e:
+        status.update(status=FAILED, error=str(e))
+    finally:
+        status["finished_at"] = time.time()
+        if status.get("started_at"):
+            status["duration_seconds"] = round(status["finished_at"] - status["started_at"], 3)
+        _write_status(status_path, status)
+        release_training_lock(lock_path)
+
+
+class TrainingJobManager:
+    """
+    Queues TrainPipeline runs and executes them one at a time, each in its own
+    worker process so training never shares the serving process' CPU time or GIL.
+
+    Job status lives in `<jobs_dir>/<job_id>.json`; the worker process updates it
+    as stages start and finish, so status survives app restarts.
+    """
+
+    def __init__(self, jobs_dir: str = TRAINING_JOBS_DIR, lock_path: str = TRAINING_LOCK_FILE_PATH,
+                 poll_interval: float = 1.0, pipeline_class=None):
+        self.jobs_dir = jobs_dir
+        self.lock_path = lock_path
+        self.poll_interval = poll_interval
+        # Run by the worker process, TrainPipeline when None; must be importable for spawn
+        self.pipeline_class = pipeline_class
+        self._queue = deque()
+        self._processes = {}
+        # Jobs whose worker is being terminated by `cancel`
+        self._cancelling = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._dispatcher = None
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def fail_interrupted_jobs(self) -> None:
+        """
+        Mark the jobs a previous app process left queued or running as failed.
+
+        Call once from the serving process before submitting jobs: a spawned worker
+        re-imports the app module and would otherwise fail the jobs still queued.
+        """
+        for status in self.list():
+            if status["status"] == QUEUED or (status["status"] == RUNNING and not _pid_alive(status.get("pid") or 0)):
+                status.update(status=FAILED, finished_at=time.time(), error="Interrupted by an app restart")
+                _write_status(self._status_path(status["job_id"]), status)
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def submit(self, resume: bool = TRAINING_RESUME) -> dict:
+        try:
+            job_id = uuid.uuid4().hex
+            status = {
+                "job_id": job_id,
+                "status": QUEUED,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "current_stage": None,
+                "resume": resume,
+                "stages": {stage: {"status": "pending", "started_at": None, "finished_at": None,
+                                   "duration_seconds": None}
+                           for stage in TRAINING_STAGES},
+                "error": None,
+            }
+            _write_status(self._status_path(job_id), status)
+            with self._lock:
+                self._queue.append(job_id)
+                self._ensure_dispatcher()
+            self._wakeup.set()
+            logging.info(f"[TRAINING JOB] Queued training job {job_id}")
+            return status
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get(self, job_id: str) -> dict:
+        status_path = self._status_path(job_id)
+        if not os.path.exists(status_path):
+            return None
+        return _read_status(status_path)
+
+    def list(self) -> list:
+        jobs = []
+        for file_name in os.listdir(self.jobs_dir):
+            if file_name.endswith(".json"):
+                jobs.append(_read_status(os.path.join(self.jobs_dir, file_name)))
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> dict:
+        with self._lock:
+            status = self.get(job_id)
+            if status is None or status["status"] in FINISHED_STATUSES:
+                return status
+            if job_id in self._queue:
+                self._queue.remove(job_id)
+            process = self._processes.get(job_id)
+            if process is None:
+                # Not started; the dispatcher re-reads the status under this lock before starting a job
+                status.update(status=CANCELLED, finished_at=time.time())
+                _write_status(self._status_path(job_id), status)
+                return status
+            self._cancelling.add(job_id)
+
+        try:
+            if process.is_alive():
+                logging.info(f"[TRAINING JOB] Terminating training job {job_id} (pid {process.pid})")
+                _terminate_job_process(process)
+                process.join(timeout=30)
+                # The worker cannot clean up after being terminated
+                release_training_lock(self.lock_path)
+
+            with self._lock:
+                status = self.get(job_id)
+                if status["status"] not in FINISHED_STATUSES:
+                    status.update(status=CANCELLED, finished_at=time.time())
+                    _write_status(self._status_path(job_id), status)
+        finally:
+            with self._lock:
+                self._cancelling.discard(job_id)
+        return status
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch, name="training-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        context = multiprocessing.get_context("spawn")
+        while True:
+            with self._lock:
+                job_id = self._queue.popleft() if self._queue else None
+            if job_id is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            # Runs are serialized here, the lock file also guards against other app processes
+            while not acquire_training_lock(self.lock_path):
+                time.sleep(self.poll_interval)
+            release_training_lock(self.lock_path)
+
+            with self._lock:
+                status = self.get(job_id)
+                if status["status"] in FINISHED_STATUSES:
+                    continue
+                process = context.Process(target=run_training_job, name=f"training-{job_id}",
+                                          args=(job_id, self._status_path(job_id), self.lock_path,
+                                                status.get("resume", False), self.pipeline_class))
+                process.start()
+                self._processes[job_id] = process
+            logging.info(f"[TRAINING JOB] Started training job {job_id} in process {process.pid}")
+
+            process.join()
+            with self._lock:
+                self._processes.pop(job_id, None)
+            logging.info(f"[TRAINING JOB] Training job {job_id} exited with code {process.exitcode}")
+
+            with self._lock:
+                status = self.get(job_id)
+                # A job being cancelled gets its status from `cancel`
+                if status["status"] not in FINISHED_STATUSES and job_id not in self._cancelling:
+                    # The worker died without recording a result (e.g. killed for memory)
+                    status.update(status=FAILED, finished_at=time.time(),
+                                  error=f"Training process exited with code {process.exitcode}")
+                    _write_status(self._status_path(job_id), status)
+                    release_training_lock(self.lock_path)
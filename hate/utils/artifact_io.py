@@ -0,0 +1,126 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Artifact formats and the file extension each one is written with
+ARTIFACT_FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+
+def check_artifact_format(artifact_format: str) -> str:
+    if artifact_format not in ARTIFACT_FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported artifact format '{artifact_format}', "
+                         f"expected one of {sorted(ARTIFACT_FORMAT_EXTENSIONS)}")
+    return artifact_format
+
+
+def artifact_file_name(file_name: str, artifact_format: str) -> str:
+    """Swap the extension of a file name for the one of the artifact format."""
+    stem, _ = os.path.splitext(file_name)
+    return stem + ARTIFACT_FORMAT_EXTENSIONS[check_artifact_format(artifact_format)]
+
+
+def infer_artifact_format(file_path: str) -> str:
+    extension = os.path.splitext(file_path)[1].lower()
+    for artifact_format, format_extension in ARTIFACT_FORMAT_EXTENSIONS.items():
+        if extension == format_extension:
+            return artifact_format
+    raise ValueError(f"Cannot infer the artifact format of {file_path}")
+
+
+def write_frame(data, file_path: str, artifact_format: str = None) -> None:
+    """Write a DataFrame or Series without its index."""
+    artifact_format = artifact_format or infer_artifact_format(file_path)
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+
+    if artifact_format == 'csv':
+        data.to_csv(file_path, index=False)
+    elif artifact_format == 'parquet':
+        data.to_parquet(file_path, index=False)
+    elif artifact_format == 'feather':
+        data.reset_index(drop=True).to_feather(file_path)
+    else:
+        check_artifact_format(artifact_format)
+
+
+def read_frame(file_path: str, artifact_format: str = None) -> pd.DataFrame:
+    artifact_format = artifact_format or infer_artifact_format(file_path)
+
+    if artifact_format == 'csv':
+        return pd.read_csv(file_path, index_col=False)
+    if artifact_format == 'parquet':
+        return pd.read_parquet(file_path)
+    if artifact_format == 'feather':
+        return pd.read_feather(file_path)
+    check_artifact_format(artifact_format)
+
+
+def sequence_dtype(max_words: int):
+    """Smallest integer dtype that holds every token index below max_words."""
+    return np.int16 if max_words <= np.iinfo(np.int16).max else np.int32
+
+
+def write_array(array, file_path: str, dtype=None) -> None:
+    np.save(file_path, np.asarray(array, dtype=dtype))
+
+
+def read_array(file_path: str, mmap: bool = True) -> np.ndarray:
+    """Open a .npy artifact, memory-mapped read-only by default so nothing is copied up front."""
+    return np.load(file_path, mmap_mode='r' if mmap else None)
+
+
+class FrameWriter:
+    """
+    Appends DataFrame chunks to one artifact file.
+
+    CSV chunks are appended to an open handle with a single header; parquet and
+    feather chunks are written as row groups / record batches of one Arrow file.
+    Use as a context manager.
+    """
+
+    def __init__(self, file_path: str, artifact_format: str = None):
+        self.file_path = file_path
+        self.artifact_format = check_artifact_format(artifact_format or infer_artifact_format(file_path))
+        self.rows = 0
+        self._handle = None
+        self._writer = None
+        self._schema = None
+
+    def __enter__(self):
+        if self.artifact_format == 'csv':
+            self._handle = open(self.file_path, 'w', newline='', encoding='utf-8')
+        return self
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.artifact_format == 'csv':
+            chunk.to_csv(self._handle, index=False, header=self.rows == 0)
+        else:
+            import pyarrow as pa
+
+            if self._schema is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._schema = table.schema
+                self._writer = self._open_arrow_writer(self._schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            self._writer.write_table(table)
+        self.rows += len(chunk)
+
+    def _open_arrow_writer(self, schema):
+        if self.artifact_format == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.file_path, schema)
+        import pyarrow.ipc as ipc
+        # Feather v2 is the Arrow IPC file format
+        return ipc.new_file(self.file_path, schema)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._handle is not None:
+            self._handle.close()
+        if self._writer is not None:
+            self._writer.close()
+        return False
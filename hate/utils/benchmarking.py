@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import numpy as np
+
+RESULTS_SCHEMA_VERSION = 1
+
+# Seed tokens the text cleaner has to deal with: mentions, links, markup, entities, digits
+COMMON_WORDS = ("you are the worst people ever seen running hating loving trash bitch amazing game "
+                "tonight retweet follow lol lmao what is this nonsense he she they them it's don't "
+                "won't can't").split()
+NOISE_TOKENS = ["@user123", "#hashtag", "http://t.co/abc123", "https://example.com/x?y=1", "www.site.org",
+                "[removed]", "<b>", "</b>", "&amp;", "&#8220;", "RT", "2nd", "100%", "\n", "!!!", "..."]
+SYLLABLES = ("ba be bi bo bu da de di do ka ke ki ko la le li lo ma me mi mo na ne ni no ra re ri ro "
+             "sa se si so ta te ti to va ve vi za zo sh ch th st").split()
+
+
+def generate_corpus(rows: int, seed: int = 42, vocabulary_size: int = 20000, mean_tokens: float = 14.0,
+                    max_tokens: int = 60, duplicate_rate: float = 0.1, noise_rate: float = 0.15,
+                    hate_rate: float = 0.3):
+    """
+    Synthetic tweets and labels, reproducible for a given seed and settings.
+
+    Token counts are lognormal around `mean_tokens` and capped at `max_tokens`,
+    words follow a Zipf-like frequency over `vocabulary_size` generated words, a
+    `noise_rate` share of tokens are mentions/links/markup, and a `duplicate_rate`
+    share of rows repeat an earlier row verbatim, like retweets and spam waves.
+    Returns (texts, labels) with labels 1 for hateful.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = list(COMMON_WORDS)
+    seen = set(vocabulary)
+    while len(vocabulary) < vocabulary_size:
+        word = "".join(rng.choice(SYLLABLES, size=rng.integers(1, 5)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    vocabulary = np.array(vocabulary, dtype=object)
+    frequency = np.cumsum(1.0 / np.arange(1, len(vocabulary) + 1) ** 1.1)
+
+    # lognormal with the requested mean, sigma gives tweets from a couple of words to long rants
+    sigma = 0.6
+    lengths = rng.lognormal(np.log(mean_tokens) - sigma ** 2 / 2, sigma, size=rows)
+    lengths = np.clip(np.rint(lengths), 1, max_tokens).astype(int)
+    labels = (rng.random(rows) < hate_rate).astype(int)
+    duplicates = rng.random(rows) < duplicate_rate
+
+    # Every token of the corpus in one draw, then cut into rows
+    tokens = vocabulary[np.searchsorted(frequency, rng.random(lengths.sum()) * frequency[-1])]
+    noisy = rng.random(len(tokens)) < noise_rate
+    tokens[noisy] = rng.choice(np.array(NOISE_TOKENS, dtype=object), size=int(noisy.sum()))
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+
+    texts = []
+    for row in range(rows):
+        if duplicates[row] and texts:
+            source = int(rng.integers(0, len(texts)))
+            texts.append(texts[source])
+            labels[row] = labels[source]
+        else:
+            texts.append(" ".join(tokens[offsets[row]:offsets[row + 1]]))
+    return texts, labels.tolist()
+
+
+def ingestion_frames(texts, labels, raw_share: float = 0.45):
+    """Split a corpus into frames shaped like the raw_data.csv and imbalanced_data.csv ingestion files."""
+    import pandas as pd
+
+    split = int(len(texts) * raw_share)
+    raw_labels = np.asarray(labels[:split])
+    # raw_data 'class': 0 hate speech, 1 offensive (both hateful after transformation), 2 neither
+    raw_class = np.where(raw_labels == 1, np.arange(split) % 2, 2)
+    raw = pd.DataFrame({"Unnamed: 0": np.arange(split), "count": 3, "hate_speech": 0,
+                        "offensive_language": 0, "neither": 0, "class": raw_class, "tweet": texts[:split]})
+    imbalance = pd.DataFrame({"id": np.arange(len(texts) - split), "label": labels[split:],
+                              "tweet": texts[split:]})
+    return raw, imbalance
+
+
+def measure(fn, repeat: int = 3, warmup: int = 0, setup=None) -> list:
+    """Wall-clock seconds of `repeat` calls of `fn`, after `warmup` untimed calls; `setup` runs untimed before each."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def percentiles(values, points=(50, 95, 99)) -> dict:
+    values = np.asarray(values, dtype=np.float64)
+    return {f"p{point}_s": float(np.percentile(values, point)) for point in points}
+
+
+def summarize(times: list, rows: int = None, **extra) -> dict:
+    """Result entry of one benchmark case: its repeat timings, median, best and throughput."""
+    median = float(np.median(times))
+    result = {"times_s": [round(t, 6) for t in times], "median_s": median, "best_s": float(min(times))}
+    if rows is not None:
+        result["rows"] = rows
+        result["rows_per_s"] = rows / median if median else None
+    result.update(extra)
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "cpu_count": os.cpu_count(), "numpy": np.__version__, "git_commit": _git_commit(),
+            "argv": sys.argv}
+
+
+def write_results(path: str, params: dict, results: dict) -> dict:
+    report = {"schema": RESULTS_SCHEMA_VERSION, "created_at": time.time(), "environment": environment(),
+              "params": params, "results": results}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("schema") != RESULTS_SCHEMA_VERSION:
+        raise ValueError(f"{path} has results schema {report.get('schema')}, expected {RESULTS_SCHEMA_VERSION}")
+    return report
+
+
+# Compared metrics, all lower is better
+COMPARED_METRICS = ("median_s", "p50_s", "p95_s", "p99_s")
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    Compare the timings of the cases present in both reports.
+
+    Returns one row per (case, metric) with the relative change; `regression`
+    is set when the current run is slower than the baseline by more than
+    `threshold` (0.1 = 10%).
+    """
+    rows = []
+    for case, base in baseline["results"].items():
+        now = current["results"].get(case)
+        if now is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in base or metric not in now or not base[metric]:
+                continue
+            change = now[metric] / base[metric] - 1
+            rows.append({"case": case, "metric": metric, "baseline": base[metric], "current": now[metric],
+                         "change": change, "regression": change > threshold})
+    return rows
@@ -0,0 +1,29 @@
+import json
+import hashlib
+import importlib.util
+
+
+def file_digest(path: str, algorithm: str = "sha256", block_size: int = 1024 * 1024) -> str:
+    """Hex digest of a file, read in blocks so large archives are never held in memory."""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def json_digest(data) -> str:
+    """Stable sha256 of JSON serializable data, independent of dict ordering."""
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def module_digest(module_names) -> str:
+    """sha256 over the source files of the given modules, a version for the code they hold."""
+    digest = hashlib.sha256()
+    for module_name in sorted(module_names):
+        spec = importlib.util.find_spec(module_name)
+        digest.update(module_name.encode("utf-8"))
+        with open(spec.origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
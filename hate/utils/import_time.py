@@ -0,0 +1,21 @@
+import sys
+import subprocess
+
+
+def import_times(module: str, cwd: str = None, env: dict = None) -> dict:
+    """
+    Import `module` in a fresh interpreter under `python -X importtime` and return
+    the cumulative import time in seconds of every module it loaded.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: <self us> | <cumulative us> | <indented module name>
+        fields = line[len("import time:"):].split("|") if line.startswith("import time:") else []
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1]) / 1e6
+    return times
@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+import inspect
+import threading
+import functools
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_mb():
+    """Current resident set size, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb():
+    """High-water resident set size of this process."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+class _RssSampler:
+    """
+    Samples RSS on a background thread while spans are open; each open span keeps
+    the highest value seen since it started. Peaks shorter than `interval` can be
+    missed. The thread exits once no span is open.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        # id -> [highest RSS in MB], one per open span
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, rss_mb: float) -> list:
+        watch = [rss_mb]
+        with self._lock:
+            self._watches[id(watch)] = watch
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+                self._thread.start()
+        return watch
+
+    def unwatch(self, watch: list, rss_mb: float) -> float:
+        """Stop tracking `watch` and return its peak, `rss_mb` being the final reading."""
+        with self._lock:
+            self._watches.pop(id(watch), None)
+            return max(watch[0], rss_mb or 0.0)
+
+    def _sample(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            rss = _rss_mb()
+            with self._lock:
+                if not self._watches:
+                    self._thread = None
+                    return
+                if rss is not None:
+                    for watch in self._watches.values():
+                        if rss > watch[0]:
+                            watch[0] = rss
+
+
+_rss_sampler = _RssSampler()
+
+
+def _children_cpu_s() -> float:
+    """CPU time of finished child processes, e.g. a text cleaning process pool."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Span:
+    """Aggregated timings of every run of one named block under the same parent."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.children_cpu_s = 0.0
+        self.rows = None
+        self.rss_start_mb = None
+        self.rss_end_mb = None
+        self.peak_rss_mb = None
+        self.attributes = {}
+        self.children = {}
+
+    def add_rows(self, rows: int) -> None:
+        self.rows = (self.rows or 0) + int(rows)
+
+    def to_dict(self) -> dict:
+        report = {
+            "name": self.name,
+            "count": self.count,
+            "wall_s": round(self.wall_s, 4),
+            # process CPU time, counts every thread of the process while the span was open
+            "cpu_s": round(self.cpu_s, 4),
+            "children_cpu_s": round(self.children_cpu_s, 4),
+            "rss_start_mb": None if self.rss_start_mb is None else round(self.rss_start_mb, 1),
+            "rss_end_mb": None if self.rss_end_mb is None else round(self.rss_end_mb, 1),
+            "peak_rss_mb": None if self.peak_rss_mb is None else round(self.peak_rss_mb, 1),
+        }
+        if self.rows is not None:
+            report["rows"] = self.rows
+            report["rows_per_s"] = round(self.rows / self.wall_s, 1) if self.wall_s else None
+        report.update(self.attributes)
+        if self.children:
+            report["children"] = [child.to_dict() for child in self.children.values()]
+        return report
+
+
+class RunRecorder:
+    """
+    Collects nested timing spans (wall/CPU time, RSS, rows/s) of a run.
+
+    Spans opened on the same thread nest; a thread that opens its first span
+    nests it under whatever span the recorder's own thread has open, so work fanned
+    out to thread pools lands under the stage that started it. Repeated spans with
+    the same name and parent are aggregated.
+    """
+
+    def __init__(self, name: str = "run"):
+        self.root = Span(name)
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._owner = threading.get_ident()
+        self._stacks = {}
+        self._lock = threading.Lock()
+
+    def _stack(self) -> list:
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            owner_stack = self._stacks.get(self._owner) or [self.root]
+            stack = self._stacks[ident] = [owner_stack[-1]]
+        return stack
+
+    @contextmanager
+    def span(self, name: str, rows: int = None, **attributes):
+        with self._lock:
+            stack = self._stack()
+            parent = stack[-1]
+            span = parent.children.get(name)
+            if span is None:
+                span = parent.children[name] = Span(name)
+            stack.append(span)
+        if rows is not None:
+            span.add_rows(rows)
+        span.attributes.update(attributes)
+
+        rss_start = _rss_mb()
+        # Per-span peak; ru_maxrss is the process high-water mark, which later stages would inherit
+        watch = _rss_sampler.watch(rss_start) if rss_start is not None else None
+        wall, cpu, children_cpu = time.perf_counter(), time.process_time(), _children_cpu_s()
+        try:
+            yield span
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            children_cpu = _children_cpu_s() - children_cpu
+            with self._lock:
+                stack.pop()
+                if len(stack) == 1 and threading.get_ident() != self._owner:
+                    # Re-anchor on the next span, pooled threads outlive the span they ran under
+                    self._stacks.pop(threading.get_ident(), None)
+                span.count += 1
+                span.wall_s += wall
+                span.cpu_s += cpu
+                span.children_cpu_s += children_cpu
+                if span.rss_start_mb is None:
+                    span.rss_start_mb = rss_start
+                span.rss_end_mb = _rss_mb()
+                if watch is not None:
+                    span.peak_rss_mb = max(span.peak_rss_mb or 0.0, _rss_sampler.unwatch(watch, span.rss_end_mb))
+
+    def report(self, **fields) -> dict:
+        self.root.wall_s = time.perf_counter() - self._start
+        self.root.peak_rss_mb = _peak_rss_mb()
+        self.root.rss_end_mb = _rss_mb()
+        return {"started_at": self.started_at, "finished_at": time.time(), **fields,
+                "spans": [child.to_dict() for child in self.root.children.values()],
+                "wall_s": round(self.root.wall_s, 4),
+                "peak_rss_mb": None if self.root.peak_rss_mb is None else round(self.root.peak_rss_mb, 1)}
+
+    def write(self, path: str, **fields) -> dict:
+        """Write the JSON run report to `path` and return it."""
+        report = self.report(**fields)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+        return report
+
+
+_recorder = RunRecorder()
+
+
+def start_run_recorder(name: str = "run") -> RunRecorder:
+    """Start collecting spans for a new run, replacing the process-wide recorder."""
+    global _recorder
+    _recorder = RunRecorder(name)
+    return _recorder
+
+
+def get_run_recorder() -> RunRecorder:
+    return _recorder
+
+
+def span(name: str, rows: int = None, **attributes):
+    """Time a block in the current run: `with span("tokenizing", rows=len(texts)) as s: ...`."""
+    return _recorder.span(name, rows=rows, **attributes)
+
+
+def timed(name: str = None, rows_arg: str = None):
+    """Decorator form of `span`; `rows_arg` names the argument whose len() is the row count."""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rows = None
+            if rows_arg is not None:
+                rows = len(signature.bind(*args, **kwargs).arguments[rows_arg])
+            with span(name or fn.__name__, rows=rows):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
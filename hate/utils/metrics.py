@@ -0,0 +1,210 @@
+import time
+import bisect
+import logging
+import threading
+
+# Text responses get "; charset=utf-8" appended by the Response class
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Base of the metric types. Counters and gauges can be given a `function`
+    returning the value (or {label values: value}) to read at scrape time instead
+    of being updated on the request path.
+    """
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=(), function=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels[name] for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label values, extra label, value) tuples, read at scrape time."""
+        if self.function is not None:
+            values = self.function()
+            if not isinstance(values, dict):
+                values = {(): values}
+            return [("", key, "", value) for key, value in values.items() if value is not None]
+        with self._lock:
+            return [("", key, "", value) for key, value in self._values.items()]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last one is +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", key, f'le="{_format_value(float(bound))}"', cumulative))
+            samples.append(("_sum", key, "", total))
+            samples.append(("_count", key, "", cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition of every registered metric."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "hate_http_requests_total", "HTTP requests by route, method and status code.", ("route", "method", "status")))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "hate_http_request_duration_seconds", "HTTP request latency by route.", ("route", "method")))
+PREDICTION_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "hate_prediction_phase_duration_seconds",
+    "Time per predicted batch spent cleaning, tokenizing, in the model forward pass and in total.", ("phase",)))
+PREDICTION_BATCH_SIZE = REGISTRY.register(Histogram(
+    "hate_prediction_batch_size", "Texts per predicted batch.", buckets=BATCH_SIZE_BUCKETS))
+PREDICTIONS = REGISTRY.register(Counter(
+    "hate_predictions_total", "Predicted texts by label.", ("label",)))
+
+
+class Timer:
+    """Accumulates named phase durations of one operation and observes them together."""
+
+    __slots__ = ("histogram", "phases", "_last", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.phases = {}
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """Record the time since the previous mark as `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def observe(self, total_phase: str = "total") -> None:
+        for phase, seconds in self.phases.items():
+            self.histogram.observe(seconds, phase=phase)
+        self.histogram.observe(time.perf_counter() - self._start, phase=total_phase)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and their latency per route template, optionally logging each one."""
+
+    def __init__(self, app, route_names: dict = None, access_logger=None):
+        self.app = app
+        # endpoint function -> route path, so /train/{job_id} stays one series
+        self.route_names = route_names if route_names is not None else {}
+        self.access_logger = access_logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            endpoint = scope.get("endpoint")
+            route = self.route_names.get(endpoint, "unmatched") if endpoint is not None else "unmatched"
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS.inc(route=route, method=scope["method"], status=status)
+            HTTP_REQUEST_SECONDS.observe(duration, route=route, method=scope["method"])
+            if self.access_logger is not None:
+                self.access_logger.log(
+                    logging.WARNING if status >= 500 else logging.INFO, "%s %s %d %.1fms",
+                    scope["method"], scope["path"], status, duration * 1000,
+                    extra={"route": route, "method": scope["method"], "status": status,
+                           "duration_ms": round(duration * 1000, 2)})
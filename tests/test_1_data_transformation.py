@@ -1,5 +1,6 @@
 import os
 import pytest
+from zipfile import ZipFile
 from hate.components.data_transforamation import DataTransformation
 from hate.entity.config_entity import DataTransformationConfig
 from hate.entity.artifact_entity import DataIngestionArtifacts
@@ -50,3 +51,129 @@ def test_data_transformation(mock_data_ingestion_artifacts, data_transformation_
         assert os.path.exists(artifact.transformed_data_path), "Transformed data file not created."
     except Exception as e:
         pytest.fail(f"Data transformation failed: {e}")
+
+
+def test_text_cleaner_matches_original_cleaning():
+    import re
+    import string
+    import nltk
+    from nltk.corpus import stopwords
+    from hate.ml.text_cleaner import TextCleaner
+
+    def original_clean_text(text):
+        stemmer = nltk.SnowballStemmer("english")
+        stopword = set(stopwords.words('english'))
+        text = str(text).lower()
+        text = re.sub(r'\[.*?\]', '', text)
+        text = re.sub(r'https?://\S+|www\.\S+', '', text)
+        text = re.sub(r'<.*?>+', '', text)
+        text = re.sub('[%s]' % re.escape(string.punctuation), '', text)
+        text = re.sub('\n', '', text)
+        text = re.sub(r'\w*\d\w*', '', text)
+        text = [word for word in text.split(' ') if word not in stopword]
+        text = " ".join(text)
+        text = [stemmer.stem(word) for word in text.split(' ')]
+        return " ".join(text)
+
+    samples = [
+        "RT @user: You are the WORST!!! http://t.co/xyz [removed] <b>bold</b>",
+        "ht[x]tp://still-a-url.com and <a www.site.org> 2nd place\nnew line",
+        "", "   ", 12345, None, "the and of", "Running runners ran quickly",
+    ]
+    cleaner = TextCleaner()
+    for sample in samples:
+        assert cleaner.clean(sample) == original_clean_text(sample), f"Cleaner output differs for {sample!r}"
+
+
+def test_clean_tweets_parallel_matches_serial(mock_data_ingestion_artifacts, data_transformation_config):
+    data_transformation = DataTransformation(data_transformation_config, mock_data_ingestion_artifacts)
+    try:
+        tweets = data_transformation.concat_dataframe()[data_transformation_config.TWEET].head(5000)
+
+        data_transformation_config.N_JOBS = 1
+        serial = data_transformation.clean_tweets(tweets)
+
+        data_transformation_config.N_JOBS = 2
+        data_transformation_config.CHUNK_SIZE = 1000
+        parallel = data_transformation.clean_tweets(tweets)
+
+        assert serial.equals(parallel), "Parallel cleaning output differs from the serial path."
+    except Exception as e:
+        pytest.fail(f"Parallel text cleaning failed: {e}")
+
+
+def test_streaming_data_transformation(mock_data_ingestion_artifacts, data_transformation_config):
+    data_transformation = DataTransformation(data_transformation_config, mock_data_ingestion_artifacts)
+    try:
+        artifact = data_transformation.initiate_data_transformation()
+        with open(artifact.transformed_data_path, 'rb') as f:
+            in_memory_output = f.read()
+
+        data_transformation_config.STREAMING = True
+        data_transformation_config.READ_CHUNK_SIZE = 5000
+        artifact = data_transformation.initiate_data_transformation()
+        with open(artifact.transformed_data_path, 'rb') as f:
+            streamed_output = f.read()
+
+        assert streamed_output == in_memory_output, "Streaming transformation output differs from the in-memory path."
+    except Exception as e:
+        pytest.fail(f"Streaming data transformation failed: {e}")
+
+
+def test_streaming_from_archive(tmp_path, mock_data_ingestion_artifacts, data_transformation_config):
+    archive_path = str(tmp_path / "dataset.zip")
+    with ZipFile(archive_path, "w") as archive:
+        archive.write(mock_data_ingestion_artifacts.imbalance_data_file_path, "imbalanced_data.csv")
+        archive.write(mock_data_ingestion_artifacts.raw_data_file_path, "raw_data.csv")
+    archive_artifacts = DataIngestionArtifacts("imbalanced_data.csv", "raw_data.csv", archive_path=archive_path)
+
+    data_transformation_config.STREAMING = True
+    try:
+        artifact = DataTransformation(data_transformation_config, mock_data_ingestion_artifacts).initiate_data_transformation()
+        with open(artifact.transformed_data_path, 'rb') as f:
+            extracted_output = f.read()
+
+        artifact = DataTransformation(data_transformation_config, archive_artifacts).initiate_data_transformation()
+        with open(artifact.transformed_data_path, 'rb') as f:
+            archive_output = f.read()
+
+        assert archive_output == extracted_output, "Reading csvs out of the archive changed the transformed data."
+    except Exception as e:
+        pytest.fail(f"Streaming from the ingestion archive failed: {e}")
+
+
+@pytest.mark.parametrize("artifact_format", ["csv", "parquet", "feather"])
+def test_artifact_format_round_trip(tmp_path, artifact_format):
+    import pandas as pd
+    from hate.utils.artifact_io import artifact_file_name, read_frame, write_frame, FrameWriter
+
+    df = pd.DataFrame({"label": [0, 1, 1], "tweet": ["good day", "bad word", "worst"]}, index=[5, 5, 6])
+    file_path = str(tmp_path / artifact_file_name("final.csv", artifact_format))
+
+    write_frame(df, file_path, artifact_format)
+    assert read_frame(file_path, artifact_format).equals(df.reset_index(drop=True)), "Round trip changed the data."
+
+    with FrameWriter(file_path, artifact_format) as writer:
+        writer.write(df.iloc[:2])
+        writer.write(df.iloc[2:])
+    assert read_frame(file_path).equals(df.reset_index(drop=True)), "Chunked write changed the data."
+
+
+def test_artifact_format_from_environment():
+    import sys
+    import subprocess
+
+    script = ("from hate.entity.config_entity import DataTransformationConfig as C; "
+              "c = C(); print(c.ARTIFACT_FORMAT, c.TRANSFORMED_FILE_PATH)")
+    # The constants are read on import, each setting needs a fresh interpreter
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    result = subprocess.run([sys.executable, "-c", script], env=dict(env, ARTIFACT_FORMAT="parquet"),
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    artifact_format, file_path = result.stdout.split()
+    assert artifact_format == "parquet" and file_path.endswith(".parquet"), result.stdout
+
+    result = subprocess.run([sys.executable, "-c", script], env=dict(env, ARTIFACT_FORMAT="xlsx"),
+                            capture_output=True, text=True)
+    assert result.returncode != 0 and "Unsupported artifact format 'xlsx'" in result.stderr, result.stderr
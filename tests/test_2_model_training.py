@@ -5,6 +5,10 @@ from hate.components.model_trainer import ModelTrainer
 from hate.entity.config_entity import ModelTrainerConfig
 from hate.entity.artifact_entity import DataTransformationArtifacts
 from hate.exception import CustomException
+from hate.ml.model import ModelArchitecture
+from hate.ml.inference_export import export_tflite, TFLiteModel, check_parity
+from hate.ml.numpy_model import export_numpy_weights, NumpyBiLSTM
+from hate.constants import MAX_LEN, MAX_WORDS
 
 # Mock fixture for ModelTrainerConfig
 @pytest.fixture
@@ -78,5 +82,68 @@ def test_initiate_model_trainer(model_trainer_config, mock_data_transformation_a
         assert os.path.exists(artifacts.trained_model_path), "Trained model file not found."
         assert os.path.exists(artifacts.x_test_path), "Test data file not found."
         assert os.path.exists(artifacts.y_test_path), "Test labels file not found."
+        assert os.path.exists(artifacts.x_test_sequences_path), "Tokenized test sequences not found."
+        assert os.path.exists(artifacts.y_test_labels_path), "Test label array not found."
+        if artifacts.inference_model_path is not None:
+            assert os.path.exists(artifacts.inference_model_path), "Inference model file not found."
     except Exception as e:
         pytest.fail(f"Model training failed: {e}")
+
+
+class CountingTFLiteModel(TFLiteModel):
+    """Records the batch size of every interpreter invocation."""
+
+    def __init__(self, model_path):
+        self.invocations = []
+        super().__init__(model_path)
+
+    def _invoke(self, batch_size, chunk):
+        self.invocations.append(batch_size)
+        return super()._invoke(batch_size, chunk)
+
+
+def test_inference_export_parity(tmp_path):
+    import math
+    import numpy as np
+    model = ModelArchitecture().get_model()
+    x = np.random.default_rng(0).integers(0, MAX_WORDS, size=(9, MAX_LEN))
+    try:
+        model_path = export_tflite(model, str(tmp_path / "model.tflite"), batch_sizes=(1, 2, 4))
+        inference_model = CountingTFLiteModel(model_path)
+        assert inference_model.batch_sizes == [1, 2, 4], f"Unexpected signatures: {inference_model.batch_sizes}"
+        # 9 rows: two full chunks of 4, the last row runs alone instead of padded to 4
+        scores = inference_model.predict_on_batch(x)
+        assert scores.shape == (9, 1), f"Unexpected output shape: {scores.shape}"
+        assert inference_model.invocations == [4, 4, 1], f"Unexpected invocations: {inference_model.invocations}"
+        assert np.allclose(scores, model.predict_on_batch(x), atol=1e-5), "Exported model scores differ."
+
+        for rows in (2, 3, 4, 5, 16):
+            inference_model.invocations = []
+            inference_model.predict_on_batch(x[np.arange(rows) % len(x)])
+            assert len(inference_model.invocations) == math.ceil(rows / 4), \
+                f"{rows} rows took {len(inference_model.invocations)} invocations"
+        assert check_parity(model, inference_model, x, np.zeros(9))["passed"]
+    except Exception as e:
+        pytest.fail(f"Inference model export failed: {e}")
+
+
+def test_numpy_engine_parity(tmp_path):
+    import numpy as np
+    model = ModelArchitecture().get_model()
+    x = np.random.default_rng(0).integers(0, MAX_WORDS, size=(7, MAX_LEN))
+    try:
+        weights_path = export_numpy_weights(model, str(tmp_path / "model_weights.npz"))
+        # 7 rows in batches of 3 exercise the partial last batch
+        scores = NumpyBiLSTM.load(weights_path, batch_size=3).predict_on_batch(x)
+        assert scores.shape == (7, 1), f"Unexpected output shape: {scores.shape}"
+        assert np.allclose(scores, model.predict_on_batch(x), atol=1e-5), "Numpy engine scores differ from Keras."
+
+        # Pre-padded rows of different lengths, bucketing must not change the scores
+        x[:, :MAX_LEN - 10] = 0
+        x[0, :] = 0
+        x[1, MAX_LEN - 3:] = 0
+        padded = NumpyBiLSTM.load(weights_path, batch_size=3, bucketing=False).predict_on_batch(x)
+        bucketed = NumpyBiLSTM.load(weights_path, batch_size=3, bucketing=True).predict_on_batch(x)
+        assert np.allclose(padded, bucketed, atol=1e-5), "Length bucketing changed the scores."
+    except Exception as e:
+        pytest.fail(f"Numpy inference engine failed: {e}")
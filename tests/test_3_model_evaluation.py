@@ -83,6 +83,24 @@ def test_preprocess_data(mock_model_trainer_artifacts, mock_data_transformation_
         pytest.fail(f"Data preprocessing failed: {e}")
 
 
+def test_preprocess_data_memory_mapped(mock_model_trainer_artifacts, mock_data_transformation_artifacts, model_evaluation_config):
+    import numpy as np
+    model_trainer_dir = os.path.dirname(mock_model_trainer_artifacts.trained_model_path)
+    mock_model_trainer_artifacts.x_test_sequences_path = os.path.join(model_trainer_dir, "x_test_sequences.npy")
+    mock_model_trainer_artifacts.y_test_labels_path = os.path.join(model_trainer_dir, "y_test.npy")
+    model_evaluation = ModelEvaluation(
+        model_evaluation_config=model_evaluation_config,
+        model_trainer_artifacts=mock_model_trainer_artifacts,
+        data_transformation_artifacts=mock_data_transformation_artifacts
+    )
+    try:
+        x_test, y_test = model_evaluation.preprocess_data()
+        assert isinstance(x_test, np.memmap), "x_test was not memory-mapped"
+        assert len(x_test) == len(y_test), "x_test and y_test sizes differ"
+    except Exception as e:
+        pytest.fail(f"Memory-mapped data preprocessing failed: {e}")
+
+
 def test_evaluate(mock_model_trainer_artifacts, mock_data_transformation_artifacts, model_evaluation_config):
     model_evaluation = ModelEvaluation(
         model_evaluation_config=model_evaluation_config,
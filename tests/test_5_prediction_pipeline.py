@@ -0,0 +1,162 @@
+import json
+import time
+import logging
+import pytest
+from hate.ml.model_registry import ModelRegistry
+from hate.pipeline.prediction_pipeline import PredictionPipeline
+from hate.ml.prediction_cache import PredictionCache
+from hate.utils.metrics import MetricsRegistry, Counter, Histogram
+from hate.logger import JsonFormatter, get_sampled_logger
+
+
+@pytest.fixture(scope="module")
+def model_registry():
+    return ModelRegistry()
+
+
+def test_model_registry_load(model_registry):
+    try:
+        model, encoder, _ = model_registry.get()
+        assert model is not None, "Model was not loaded."
+        assert encoder is not None, "Sequence encoder was not loaded."
+    except Exception as e:
+        pytest.fail(f"Model registry load failed: {e}")
+
+
+def test_model_registry_reload_unchanged(model_registry):
+    try:
+        model_registry.get()
+        state = model_registry.get()
+        reloaded = model_registry.reload()
+        if model_registry.version is not None:
+            assert not reloaded, "Unchanged model version should not be reloaded."
+            assert model_registry.get() is state, "Resident model was replaced without a new version."
+    except Exception as e:
+        pytest.fail(f"Model registry reload failed: {e}")
+
+
+def test_prediction_pipeline(model_registry):
+    prediction_pipeline = PredictionPipeline(model_registry=model_registry)
+    try:
+        result = prediction_pipeline.run_pipeline("This is an example tweet.")
+        assert result in ("hate and abusive", "no hate"), f"Unexpected prediction: {result}"
+    except Exception as e:
+        pytest.fail(f"Prediction pipeline failed: {e}")
+
+
+def test_prediction_pipeline_batch(model_registry):
+    prediction_pipeline = PredictionPipeline(model_registry=model_registry)
+    texts = ["This is an example tweet.", "Another example tweet.", "This is an example tweet."]
+    try:
+        results = prediction_pipeline.predict_batch(texts)
+        assert len(results) == len(texts), "Batch prediction returned the wrong number of results."
+        assert results == [prediction_pipeline.predict(text) for text in texts], "Batch and single predictions differ."
+    except Exception as e:
+        pytest.fail(f"Batch prediction failed: {e}")
+
+
+def test_sequence_encoder_matches_tokenizer():
+    import pickle
+    from keras.utils import pad_sequences
+    from hate.constants import MAX_LEN, TOKENIZER_FILE_PATH
+    from hate.ml.sequence_encoder import SequenceEncoder
+
+    with open(TOKENIZER_FILE_PATH, 'rb') as handle:
+        tokenizer = pickle.load(handle)
+    texts = ["", "  ", "hate hate you", "a " * 300, "Some UPPER case, with punctuation!\tand tabs",
+             " ".join(list(tokenizer.word_index)[:500])]
+    encoder = SequenceEncoder.from_tokenizer(tokenizer, max_len=MAX_LEN)
+    expected = pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=MAX_LEN)
+    assert (encoder.encode(texts) == expected).all(), "Encoder output differs from texts_to_sequences + pad_sequences."
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    import asyncio
+    from hate.pipeline.micro_batcher import MicroBatcher
+
+    batch_sizes = []
+
+    def batch_fn(items):
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        micro_batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*[micro_batcher.submit(i) for i in range(20)])
+        finally:
+            await micro_batcher.stop()
+
+    results = asyncio.run(run())
+    assert results == [i * 2 for i in range(20)], "Results were not returned in submission order."
+    assert batch_sizes == [8, 8, 4], f"Unexpected batch sizes: {batch_sizes}"
+
+
+def test_prediction_cache_lru_and_invalidation():
+    cache = PredictionCache(max_size=2)
+    model, new_model = object(), object()
+    try:
+        cache.bind(model)
+        cache.put(("v1", b"a"), 0.9)
+        cache.put(("v1", b"b"), 0.1)
+        assert cache.get(("v1", b"a")) == 0.9, "Cached score was not returned."
+        # b is now the least recently used entry
+        cache.put(("v1", b"c"), 0.5)
+        assert cache.get(("v1", b"b")) is None, "Least recently used entry was not evicted."
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+        cache.bind(model)
+        assert cache.get(("v1", b"a")) == 0.9, "Binding the same model cleared the cache."
+        cache.bind(new_model)
+        assert cache.get(("v1", b"a")) is None, "Cache was not invalidated for a new model."
+    except Exception as e:
+        pytest.fail(f"Prediction cache failed: {e}")
+
+
+def test_prediction_cache_ttl():
+    cache = PredictionCache(max_size=10, ttl=0.01)
+    try:
+        cache.put("key", 0.7)
+        assert cache.get("key") == 0.7
+        time.sleep(0.02)
+        assert cache.get("key") is None, "Expired entry was returned."
+    except Exception as e:
+        pytest.fail(f"Prediction cache TTL failed: {e}")
+
+
+def test_metrics_render():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+    try:
+        requests.inc(route="/predict")
+        requests.inc(2, route="/predict")
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/predict"} 3' in text, "Counter was not accumulated per label."
+        # Buckets are cumulative and include their upper bound
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1.0"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "latency_seconds_count 4" in text and "latency_seconds_sum 3.65" in text
+    except Exception as e:
+        pytest.fail(f"Metrics rendering failed: {e}")
+
+
+def test_request_logging_is_sampled_and_structured():
+    sampled = get_sampled_logger("hate.test_sampled", sample_rate=0.0)
+    try:
+        assert not sampled.isEnabledFor(logging.INFO), "Info record passed a 0% sample."
+        assert sampled.isEnabledFor(logging.ERROR), "Errors must never be sampled out."
+        sampled.sample_rate = 1.0
+        assert sampled.isEnabledFor(logging.INFO)
+
+        record = logging.LogRecord("hate.request", logging.INFO, __file__, 1, "predicted %d texts", (3,), None)
+        record.duration_ms = 1.5
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["message"] == "predicted 3 texts" and entry["level"] == "INFO"
+        assert entry["duration_ms"] == 1.5, "Extra fields were not kept in the JSON record."
+    except Exception as e:
+        pytest.fail(f"Request logging failed: {e}")
@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import pytest
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from hate.constants import TRAINING_STAGES
+from hate.pipeline.training_jobs import (TrainingJobManager, acquire_training_lock, release_training_lock,
+                                         CANCELLED, FAILED, SUCCEEDED, FINISHED_STATUSES)
+from hate.pipeline.stage_cache import StageCache
+from hate.utils.instrumentation import RunRecorder
+from hate.entity.config_entity import DataTransformationConfig
+from hate.entity.artifact_entity import DataTransformationArtifacts
+
+
+@pytest.fixture
+def job_manager(tmp_path):
+    return TrainingJobManager(jobs_dir=str(tmp_path / "jobs"), lock_path=str(tmp_path / "artifacts.lock"))
+
+
+def test_training_lock(tmp_path):
+    lock_path = str(tmp_path / "artifacts.lock")
+    try:
+        assert acquire_training_lock(lock_path), "Lock could not be acquired."
+        assert not acquire_training_lock(lock_path), "Lock was acquired twice for the same artifacts root."
+        release_training_lock(lock_path)
+
+        # A lock left behind by a dead process is taken over
+        with open(lock_path, "w") as f:
+            f.write("999999999")
+        assert acquire_training_lock(lock_path), "Stale lock was not replaced."
+        release_training_lock(lock_path)
+    except Exception as e:
+        pytest.fail(f"Training lock failed: {e}")
+
+
+def test_cancel_queued_job(job_manager):
+    try:
+        # Hold the lock so the dispatcher cannot start the run
+        assert acquire_training_lock(job_manager.lock_path)
+        status = job_manager.submit()
+        assert job_manager.get(status["job_id"]) is not None, "Job status was not recorded."
+
+        cancelled = job_manager.cancel(status["job_id"])
+        assert cancelled["status"] == CANCELLED, f"Unexpected job status: {cancelled['status']}"
+        assert job_manager.list()[0]["job_id"] == status["job_id"], "Job missing from the job list."
+        assert job_manager.get("missing") is None
+    except Exception as e:
+        pytest.fail(f"Cancelling a queued training job failed: {e}")
+    finally:
+        release_training_lock(job_manager.lock_path)
+
+
+def test_interrupted_jobs_marked_failed(job_manager):
+    try:
+        assert acquire_training_lock(job_manager.lock_path)
+        status = job_manager.submit()
+        # Creating a manager leaves other processes' jobs alone, the serving process sweeps them explicitly
+        restarted = TrainingJobManager(jobs_dir=job_manager.jobs_dir, lock_path=job_manager.lock_path)
+        assert restarted.get(status["job_id"])["status"] != FAILED
+        # After an app restart a queued job cannot be resumed
+        restarted.fail_interrupted_jobs()
+        assert restarted.get(status["job_id"])["status"] == FAILED
+    except Exception as e:
+        pytest.fail(f"Interrupted training job was not marked failed: {e}")
+    finally:
+        release_training_lock(job_manager.lock_path)
+
+
+class ReimportingPipeline:
+    """Quick stand-in for TrainPipeline that, like a worker re-importing app.py, builds a job manager."""
+
+    def __init__(self, progress_callback, resume=False):
+        TrainingJobManager()
+        self.progress_callback = progress_callback
+
+    def run_pipeline(self):
+        for stage in TRAINING_STAGES:
+            self.progress_callback(stage, "running")
+            self.progress_callback(stage, "completed")
+
+
+def test_queued_jobs_all_run(tmp_path, monkeypatch):
+    # Default job and lock paths are relative, the worker shares them through the working directory
+    monkeypatch.chdir(tmp_path)
+    manager = TrainingJobManager(poll_interval=0.1, pipeline_class=ReimportingPipeline)
+    try:
+        manager.fail_interrupted_jobs()
+        job_ids = [manager.submit()["job_id"] for _ in range(2)]
+        deadline = time.time() + 120
+        while (time.time() < deadline
+               and any(manager.get(job_id)["status"] not in FINISHED_STATUSES for job_id in job_ids)):
+            time.sleep(0.2)
+        statuses = [manager.get(job_id) for job_id in job_ids]
+        assert [status["status"] for status in statuses] == [SUCCEEDED, SUCCEEDED], \
+            f"Queued jobs did not all run: {[(status['status'], status['error']) for status in statuses]}"
+    except Exception as e:
+        pytest.fail(f"Running queued training jobs failed: {e}")
+
+
+def wait_for(condition, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not condition():
+        time.sleep(0.1)
+    return condition()
+
+
+def test_cancel_job_taken_by_dispatcher(tmp_path):
+    manager = TrainingJobManager(jobs_dir=str(tmp_path / "jobs"), lock_path=str(tmp_path / "artifacts.lock"),
+                                 poll_interval=0.05, pipeline_class=ReimportingPipeline)
+    try:
+        # The dispatcher takes the job off the queue and waits for the lock
+        assert acquire_training_lock(manager.lock_path)
+        job_id = manager.submit()["job_id"]
+        assert wait_for(lambda: not manager._queue), "Dispatcher did not take the job."
+
+        assert manager.cancel(job_id)["status"] == CANCELLED
+        release_training_lock(manager.lock_path)
+        time.sleep(1)
+        status = manager.get(job_id)
+        assert status["status"] == CANCELLED and status["started_at"] is None, \
+            f"Cancelled job was started: {status}"
+    except Exception as e:
+        pytest.fail(f"Cancelling a dispatched training job failed: {e}")
+    finally:
+        release_training_lock(manager.lock_path)
+
+
+def _process_running(pid: int) -> bool:
+    # Terminated orphans may stay zombies when nothing reaps them
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+class ChildProcessPipeline:
+    """Starts a long running child process, like the cleaning pool, and records its pid in child.pid."""
+
+    def __init__(self, progress_callback, resume=False):
+        self.progress_callback = progress_callback
+
+    def run_pipeline(self):
+        self.progress_callback(TRAINING_STAGES[0], "running")
+        child = multiprocessing.get_context("spawn").Process(target=time.sleep, args=(600,))
+        child.start()
+        with open("child.pid", "w") as f:
+            f.write(str(child.pid))
+        time.sleep(600)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc") or not hasattr(os, "killpg"), reason="needs POSIX process groups")
+def test_cancel_running_job_stops_its_children(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = TrainingJobManager(poll_interval=0.1, pipeline_class=ChildProcessPipeline)
+    try:
+        job_id = manager.submit()["job_id"]
+        assert wait_for(lambda: os.path.exists("child.pid") and open("child.pid").read()), "Job did not start."
+        child_pid = int(open("child.pid").read())
+
+        assert manager.cancel(job_id)["status"] == CANCELLED
+        assert wait_for(lambda: not _process_running(child_pid), timeout=10), \
+            "Child process of the cancelled job is still running."
+        assert manager.get(job_id)["status"] == CANCELLED
+    except Exception as e:
+        pytest.fail(f"Cancelling a running training job failed: {e}")
+
+
+def test_stage_cache_reuses_matching_fingerprint(tmp_path):
+    transformed_path = tmp_path / "final.csv"
+    transformed_path.write_text("tweet,label\n")
+    previous_run = StageCache(artifacts_dir=str(tmp_path / "artifacts" / "01_01_2024_00_00_00"))
+    current_run = StageCache(artifacts_dir=str(tmp_path / "artifacts" / "01_02_2024_00_00_00"))
+    config = DataTransformationConfig()
+    try:
+        fingerprint = previous_run.fingerprint("data_transformation", config, ["ingestion-fingerprint"])
+        previous_run.record("data_transformation", fingerprint, DataTransformationArtifacts(str(transformed_path)))
+
+        reused = current_run.lookup("data_transformation", fingerprint, DataTransformationArtifacts)
+        assert reused is not None and reused.transformed_data_path == str(transformed_path)
+
+        config.CHUNK_SIZE += 1
+        changed = current_run.fingerprint("data_transformation", config, ["ingestion-fingerprint"])
+        assert changed != fingerprint, "Config change did not change the fingerprint."
+
+        transformed_path.write_text("tweet,label\nmodified,1\n")
+        assert current_run.lookup("data_transformation", fingerprint, DataTransformationArtifacts) is None, \
+            "Stage was reused although its output changed."
+    except Exception as e:
+        pytest.fail(f"Stage cache failed: {e}")
+
+
+def test_run_recorder_report(tmp_path):
+    recorder = RunRecorder()
+
+    def evaluate():
+        with recorder.span("evaluate", rows=10):
+            pass
+
+    try:
+        with recorder.span("data_transformation") as stage:
+            stage.attributes["status"] = "completed"
+            for _ in range(2):
+                with recorder.span("clean_tweets", rows=100):
+                    pass
+            # Spans opened in pool threads nest under the stage that is open
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(evaluate).result()
+
+        report = recorder.write(str(tmp_path / "run_report.json"), status="succeeded")
+        assert json.load(open(tmp_path / "run_report.json")) == report, "Written report differs."
+
+        stage_report = report["spans"][0]
+        assert stage_report["name"] == "data_transformation" and stage_report["status"] == "completed"
+        children = {child["name"]: child for child in stage_report["children"]}
+        assert children["clean_tweets"]["count"] == 2 and children["clean_tweets"]["rows"] == 200, \
+            "Repeated spans were not aggregated."
+        assert "evaluate" in children, "Span opened in a worker thread was not nested under the stage."
+    except Exception as e:
+        pytest.fail(f"Run recorder failed: {e}")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="per-span RSS needs /proc")
+def test_run_recorder_peak_rss_per_span():
+    import numpy as np
+    recorder = RunRecorder()
+    try:
+        with recorder.span("heavy"):
+            buffer = np.ones(300 * 1024 ** 2 // 8)
+            time.sleep(0.3)
+            del buffer
+        with recorder.span("light"):
+            time.sleep(0.3)
+
+        heavy, light = (span.to_dict() for span in recorder.root.children.values())
+        assert heavy["peak_rss_mb"] - heavy["rss_start_mb"] > 250, f"Peak of the heavy span was missed: {heavy}"
+        assert light["peak_rss_mb"] < heavy["peak_rss_mb"] - 250, \
+            f"Later span reported the earlier span's peak: {light['peak_rss_mb']} vs {heavy['peak_rss_mb']}"
+    except Exception as e:
+        pytest.fail(f"Per-span peak RSS failed: {e}")
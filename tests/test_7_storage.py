@@ -0,0 +1,297 @@
+import os
+import base64
+import hashlib
+import pytest
+from hate.configuration.download_cache import DownloadCache
+from hate.configuration.gcloud_syncer import GCloudSync, build_http_session
+from hate.configuration.storage import Storage, LocalStorage, get_storage
+
+
+def test_download_cache_hit_and_miss(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024)
+    downloads = []
+
+    def download(path):
+        downloads.append(path)
+        with open(path, "wb") as f:
+            f.write(b"model bytes")
+
+    try:
+        assert not cache.fetch("md5-abc", str(tmp_path / "a.h5"), download), "First fetch should miss."
+        assert cache.fetch("md5-abc", str(tmp_path / "b.h5"), download), "Second fetch should hit."
+        assert len(downloads) == 1, "Cached blob was downloaded again."
+        assert (tmp_path / "b.h5").read_bytes() == b"model bytes"
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    except Exception as e:
+        pytest.fail(f"Download cache failed: {e}")
+
+
+def test_download_cache_evicts_least_recently_used(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / "cache"), max_bytes=25)
+
+    def download(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+
+    try:
+        for key in ("md5-1", "md5-2"):
+            cache.fetch(key, str(tmp_path / key), download)
+        # Make md5-2 the least recently used blob
+        os.utime(cache._access_path("md5-2"), (0, 0))
+        cache.fetch("md5-3", str(tmp_path / "md5-3"), download)
+        assert sorted(os.listdir(cache.cache_dir)) == [".access", "md5-1", "md5-3"], "Wrong blob was evicted."
+        assert sorted(os.listdir(cache.access_dir)) == ["md5-1", "md5-3"], "Access marker of the evicted blob kept."
+    except Exception as e:
+        pytest.fail(f"Download cache eviction failed: {e}")
+
+
+def test_download_cache_serves_blob_larger_than_cache(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / "cache"), max_bytes=5)
+
+    def download(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+
+    try:
+        assert not cache.fetch("md5-big", str(tmp_path / "big.h5"), download)
+        assert (tmp_path / "big.h5").read_bytes() == b"x" * 10, "Oversized blob was not served."
+    except Exception as e:
+        pytest.fail(f"Download cache failed on an oversized blob: {e}")
+
+
+def test_download_cache_hit_keeps_served_file_mtime(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024)
+
+    def download(path):
+        with open(path, "wb") as f:
+            f.write(b"dataset bytes")
+
+    try:
+        first = tmp_path / "run_1" / "dataset.zip"
+        first.parent.mkdir()
+        cache.fetch("md5-abc", str(first), download)
+        os.utime(first, ns=(0, 10 ** 9))
+        # Earlier runs fingerprint their artifacts by size and mtime, a later hit must not touch them
+        assert cache.fetch("md5-abc", str(tmp_path / "run_2.zip"), download)
+        assert first.stat().st_mtime_ns == 10 ** 9, "Cache hit rewrote the mtime of an earlier run's artifact."
+        assert sorted(os.listdir(cache.cache_dir)) == [".access", "md5-abc"]
+    except Exception as e:
+        pytest.fail(f"Download cache hit changed a served file: {e}")
+
+
+class EvictDuringFetchCache(DownloadCache):
+    """Runs a full eviction between the hit check and the copy, as a concurrent fetch could."""
+
+    def _materialize(self, blob_path, local_path):
+        self.max_bytes = 0
+        self.evict()
+        super()._materialize(blob_path, local_path)
+
+
+def test_download_cache_never_evicts_blob_being_served(tmp_path):
+    cache = EvictDuringFetchCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024)
+    downloads = []
+
+    def download(path):
+        downloads.append(path)
+        with open(path, "wb") as f:
+            f.write(b"model bytes")
+
+    try:
+        cache.fetch("md5-abc", str(tmp_path / "a.h5"), download)
+        cache.max_bytes = 1024
+        assert cache.fetch("md5-abc", str(tmp_path / "b.h5"), download), "Second fetch should hit."
+        assert (tmp_path / "b.h5").read_bytes() == b"model bytes", "Pinned blob was evicted while served."
+        assert len(downloads) == 1
+    except Exception as e:
+        pytest.fail(f"Download cache evicted a blob being served: {e}")
+
+
+def test_local_storage_round_trip(tmp_path):
+    storage = LocalStorage(root=str(tmp_path / "bucket_root"))
+    local_file = tmp_path / "model.h5"
+    local_file.write_bytes(b"weights")
+    try:
+        assert not storage.exists("bucket", "model.h5")
+        storage.put("bucket", str(local_file))
+        assert storage.exists("bucket", "model.h5"), "Object was not stored."
+
+        stat = storage.stat("bucket", "model.h5")
+        assert stat["size"] == 7 and stat["version"] == storage.get_object_version("bucket", "model.h5")
+
+        local_path = storage.get("bucket", "model.h5", str(tmp_path / "download"))
+        assert open(local_path, "rb").read() == b"weights", "Downloaded object differs."
+        with pytest.raises(FileNotFoundError):
+            storage.get("bucket", "missing.h5", str(tmp_path / "download"))
+    except Exception as e:
+        pytest.fail(f"Local storage round trip failed: {e}")
+
+
+def test_storage_backends_implement_every_operation():
+    class PutOnlyStorage(Storage):
+        def put(self, bucket, local_path, name=None):
+            pass
+
+    for backend in (Storage, PutOnlyStorage):
+        with pytest.raises(TypeError):
+            backend()
+    assert not LocalStorage.__abstractmethods__ and not GCloudSync.__abstractmethods__
+
+
+def test_get_storage():
+    assert isinstance(get_storage("local"), LocalStorage)
+    with pytest.raises(ValueError):
+        get_storage("ftp")
+
+
+class FakeBlob:
+    """In-memory stand-in for google.cloud.storage.Blob, objects live in the bucket's dict."""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    @property
+    def _object(self):
+        return self.bucket.objects[self.name]
+
+    @property
+    def size(self):
+        return len(self._object["data"])
+
+    @property
+    def md5_hash(self):
+        return base64.b64encode(hashlib.md5(self._object["data"]).digest()).decode()
+
+    @property
+    def generation(self):
+        return self._object["generation"]
+
+    crc32c = etag = None
+
+    def upload_from_filename(self, path):
+        self.bucket.client.requests.append(("upload", self.name))
+        with open(path, "rb") as f:
+            self.bucket.store(self.name, f.read())
+
+    def download_to_filename(self, path):
+        self.bucket.client.requests.append(("download", self.name))
+        with open(path, "wb") as f:
+            f.write(self._object["data"])
+
+    def exists(self):
+        return self.name in self.bucket.objects
+
+    def delete(self):
+        del self.bucket.objects[self.name]
+
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.objects = {}
+
+    def store(self, name, data):
+        generation = self.objects.get(name, {}).get("generation", 0) + 1
+        self.objects[name] = {"data": data, "generation": generation}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        return FakeBlob(self, name) if name in self.objects else None
+
+
+class FakeStorageClient:
+    def __init__(self):
+        self.buckets = {}
+        self.requests = []
+
+    def bucket(self, name):
+        return self.buckets.setdefault(name, FakeBucket(self, name))
+
+
+@pytest.fixture
+def fake_transfer_manager(monkeypatch):
+    """Chunked transfers against the fake client, recording the chunk sizes they were given."""
+    from google.cloud.storage import transfer_manager
+
+    def upload_chunks_concurrently(path, blob, chunk_size, worker_type, max_workers):
+        blob.bucket.client.requests.append(("upload_chunks", blob.name, chunk_size, max_workers))
+        with open(path, "rb") as f:
+            blob.bucket.store(blob.name, b"".join(iter(lambda: f.read(chunk_size), b"")))
+
+    def download_chunks_concurrently(blob, path, chunk_size, worker_type, max_workers):
+        blob.bucket.client.requests.append(("download_chunks", blob.name, chunk_size, max_workers))
+        data = blob.bucket.objects[blob.name]["data"]
+        with open(path, "wb") as f:
+            for start in range(0, len(data), chunk_size):
+                f.write(data[start:start + chunk_size])
+
+    monkeypatch.setattr(transfer_manager, "upload_chunks_concurrently", upload_chunks_concurrently)
+    monkeypatch.setattr(transfer_manager, "download_chunks_concurrently", download_chunks_concurrently)
+
+
+def test_gcloud_sync_transfers_by_size(tmp_path, fake_transfer_manager):
+    client = FakeStorageClient()
+    cache = DownloadCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024)
+    storage = GCloudSync(client=client, max_workers=2, chunk_size=4, parallel_threshold=10, cache=cache)
+    small, large = tmp_path / "small.bin", tmp_path / "large.bin"
+    small.write_bytes(b"123456789")
+    large.write_bytes(b"0123456789abcdef")
+    try:
+        storage.put("bucket", str(small))
+        storage.put("bucket", str(large))
+        assert client.requests == [("upload", "small.bin"), ("upload_chunks", "large.bin", 4, 2)], \
+            f"Unexpected uploads: {client.requests}"
+
+        client.requests = []
+        assert open(storage.get("bucket", "small.bin", str(tmp_path / "out")), "rb").read() == b"123456789"
+        assert open(storage.get("bucket", "large.bin", str(tmp_path / "out")), "rb").read() == b"0123456789abcdef"
+        assert client.requests == [("download", "small.bin"), ("download_chunks", "large.bin", 4, 2)], \
+            f"Unexpected downloads: {client.requests}"
+        assert not [name for name in os.listdir(tmp_path / "out") if name.endswith(".part")], "Partial file left."
+    except Exception as e:
+        pytest.fail(f"GCloudSync transfer failed: {e}")
+
+
+def test_gcloud_sync_missing_object_and_version(tmp_path):
+    client = FakeStorageClient()
+    storage = GCloudSync(client=client, cache=DownloadCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024))
+    local_file = tmp_path / "model.h5"
+    try:
+        with pytest.raises(FileNotFoundError):
+            storage.get("bucket", "model.h5", str(tmp_path / "out"))
+        with pytest.raises(FileNotFoundError):
+            storage.get_object_version("bucket", "model.h5")
+        assert not storage.exists("bucket", "model.h5")
+
+        local_file.write_bytes(b"weights v1")
+        storage.put("bucket", str(local_file))
+        first = storage.get_object_version("bucket", "model.h5")
+        local_file.write_bytes(b"weights v2")
+        storage.put("bucket", str(local_file))
+        assert storage.get_object_version("bucket", "model.h5") != first, "Overwrite kept the object version."
+        assert storage.stat("bucket", "model.h5")["md5"] == hashlib.md5(b"weights v2").hexdigest()
+
+        # Downloads go through the content addressed cache, the second one is served locally
+        client.requests = []
+        storage.get("bucket", "model.h5", str(tmp_path / "a"))
+        storage.get("bucket", "model.h5", str(tmp_path / "b"))
+        assert client.requests == [("download", "model.h5")], f"Cached object downloaded again: {client.requests}"
+        assert (tmp_path / "b" / "model.h5").read_bytes() == b"weights v2"
+
+        storage.delete("bucket", "model.h5")
+        storage.delete("bucket", "model.h5")
+        assert not storage.exists("bucket", "model.h5")
+    except Exception as e:
+        pytest.fail(f"GCloudSync object lookup failed: {e}")
+
+
+def test_build_http_session_pool_size():
+    from google.auth.credentials import AnonymousCredentials
+
+    session = build_http_session(AnonymousCredentials(), pool_size=24)
+    for url in ("https://storage.googleapis.com", "http://localhost:4443"):
+        assert session.get_adapter(url)._pool_maxsize == 24, f"Connection pool not sized for {url}"
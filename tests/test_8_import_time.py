@@ -0,0 +1,29 @@
+import os
+import pytest
+from hate.utils.import_time import import_times
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Training-only packages serving must not import at module load
+HEAVY_MODULES = ("tensorflow", "keras", "sklearn", "pandas", "nltk", "scipy")
+
+# Cumulative import time budgets in seconds, roughly 4x the measured times
+IMPORT_TIME_BUDGETS = {
+    "hate.pipeline.prediction_pipeline": 0.4,
+    "app": 1.0,
+}
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_TIME_BUDGETS))
+def test_import_time_budget(module, tmp_path):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    try:
+        # Importing app creates its working directories, keep them out of the repo
+        times = import_times(module, cwd=str(tmp_path), env=env)
+    except Exception as e:
+        pytest.fail(f"Importing {module} failed: {e}")
+
+    heavy = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"{module} imports training-only modules at load time: {heavy[:10]}"
+    assert times[module] <= IMPORT_TIME_BUDGETS[module], \
+        f"Importing {module} took {times[module]:.2f}s, budget is {IMPORT_TIME_BUDGETS[module]}s"
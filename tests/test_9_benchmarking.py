@@ -0,0 +1,32 @@
+import pytest
+from hate.utils.benchmarking import generate_corpus, ingestion_frames, summarize, compare_results
+
+
+def test_synthetic_corpus():
+    try:
+        texts, labels = generate_corpus(2000, seed=7, mean_tokens=10, max_tokens=30, duplicate_rate=0.2)
+        assert (texts, labels) == generate_corpus(2000, seed=7, mean_tokens=10, max_tokens=30, duplicate_rate=0.2), \
+            "Corpus is not reproducible for a seed."
+        assert len(texts) == len(labels) == 2000
+        assert max(len(text.split()) for text in texts) <= 30, "Tweet longer than max_tokens."
+        assert 0.7 < len(set(texts)) / len(texts) < 0.9, "Duplicate rate was not applied."
+
+        raw, imbalance = ingestion_frames(texts, labels)
+        assert len(raw) + len(imbalance) == len(texts)
+        assert {"class", "tweet"} <= set(raw.columns) and {"id", "label", "tweet"} <= set(imbalance.columns)
+    except Exception as e:
+        pytest.fail(f"Synthetic corpus generation failed: {e}")
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"tokenizing": summarize([1.0, 1.0, 1.0], rows=100),
+                            "predict_single": summarize([2.0], rows=10, p50_s=0.010, p99_s=0.020)}}
+    current = {"results": {"tokenizing": summarize([1.05, 1.05, 1.05], rows=100),
+                           "predict_single": summarize([2.0], rows=10, p50_s=0.010, p99_s=0.030)}}
+    try:
+        rows = {(row["case"], row["metric"]): row for row in compare_results(baseline, current, threshold=0.1)}
+        assert not rows[("tokenizing", "median_s")]["regression"], "5% slowdown flagged at a 10% threshold."
+        assert rows[("predict_single", "p99_s")]["regression"], "50% p99 slowdown was not flagged."
+        assert not rows[("predict_single", "p50_s")]["regression"]
+    except Exception as e:
+        pytest.fail(f"Benchmark comparison failed: {e}")